@@ -0,0 +1,266 @@
+"""Headless load test of the MeasureUp Estimator App wizard.
+
+Drives complete sessions through the six wizard pages (Start, Step 1 ...
+report) with Streamlit's AppTest, in several worker processes at once, and
+reports per-page latency percentiles, throughput and memory: resident set
+growth per worker and the pickled size of each session's state. Everything
+runs in-process, so no server or network is needed.
+
+    python benchmarks/load_test.py                              # 4 workers x 10 sessions
+    python benchmarks/load_test.py --workers 8 --sessions 50 -o load.json
+    python benchmarks/load_test.py --max-p95-ms 500 --max-session-bytes 20000   # exit 1 if exceeded
+
+Sessions stay alive until their worker finishes, as they would on a server,
+so the memory growth reflects the cost of open sessions.
+"""
+
+import argparse
+import functools
+import json
+import os
+import pickle
+import platform
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+APP_PATH = os.path.join(ROOT, "measureup_appV2.py")
+PERCENTILES = (50, 90, 95, 99)
+# Wizard step -> page label used in the report
+STEPS = ["1 start", "2 stakeholders", "3 select value", "4 activity details", "5 calculate", "6 report"]
+
+
+def rss_bytes():
+    """Current resident set size of this process."""
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+
+        # Peak rather than current RSS where /proc is unavailable (KiB on Linux, bytes on macOS)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def session_state_bytes(at):
+    total = 0
+    for value in at.session_state.to_dict().values():
+        try:
+            total += len(pickle.dumps(value))
+        except Exception:
+            # Widget values and other unpicklable entries are not counted
+            pass
+    return total
+
+
+@functools.lru_cache(maxsize=None)
+def _keep_media_storage():
+    """Make AppTest's in-memory media storage reachable after a run.
+
+    AppTest drops its mock runtime when a run finishes, so download button
+    data would otherwise be unreachable. Returns a function mapping a
+    download URL to the file's bytes.
+    """
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+    from streamlit.testing.v1 import app_test
+
+    class KeptStorage(MemoryMediaFileStorage):
+        latest = None
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            KeptStorage.latest = self
+
+    app_test.MemoryMediaFileStorage = KeptStorage
+    return lambda url: KeptStorage.latest.get_file(url.rsplit("/", 1)[-1]).content
+
+
+class Session:
+    """One simulated user; ``timings`` holds (page label, seconds) per interaction."""
+
+    def __init__(self, rng, choices, timeout):
+        from streamlit.testing.v1 import AppTest
+
+        self.rng = rng
+        self.choices = choices
+        self.timings = []
+        self.at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+        self.media = _keep_media_storage()
+
+    def _run(self, label, action=None):
+        started = time.perf_counter()
+        if action is not None:
+            action()
+        self.at.run()
+        self.timings.append((label, time.perf_counter() - started))
+        if self.at.exception:
+            raise RuntimeError(f"{label}: {self.at.exception[0].value}")
+
+    def _click(self, label):
+        return next(button for button in self.at.button if button.label == label).click
+
+    def run(self):
+        at = self.at
+        value_name, level, silver_name = self.rng.choice(self.choices)
+        self._run(STEPS[0])
+        self._run(STEPS[0], self._click("Start"))
+
+        at.text_area(key="stakeholders_input").input("Local residents")
+        at.text_area(key="activity_input").input("Employment support programme")
+        self._run(STEPS[1], self._click("Next →"))
+
+        self._run(STEPS[2], lambda: at.selectbox(key="category_select").select(value_name))
+        self._run(STEPS[2], lambda: at.selectbox(key="level_select").select(level))
+        if silver_name is not None:
+            self._run(STEPS[2], lambda: at.selectbox(key="silver_select").select(silver_name))
+        self._run(STEPS[2], self._click("Next →"))
+
+        self._run(STEPS[3], lambda: at.number_input(key="unit1_input").set_value(self.rng.randint(1, 100)))
+        self._run(STEPS[3], lambda: at.selectbox(key="impact_level_select").select(self.rng.choice(["No discount", "Low", "Medium", "High"])))
+        self._run(STEPS[3], self._click("Next →"))
+
+        self._run(STEPS[4], lambda: at.selectbox(key="value_type_select").select(self.rng.choice(["Economic", "Fiscal", "Wellbeing", "Environmental"])))
+        self._run(STEPS[4], self._click("Next →"))
+
+        # Page 6 builds the report and its CSV download on every run
+        self._run(STEPS[5], self._click("➕ Add to Portfolio"))
+        buttons = [button for button in at.get("download_button") if button.proto.label.startswith("📥 Download Report")]
+        if not buttons:
+            raise RuntimeError("report download missing on page 6")
+        report = self.media(buttons[0].proto.url)
+        if not report.startswith(b"Item,Value\n") or report.count(b"\n") < 2:
+            raise RuntimeError("page 6 report download is not a CSV report")
+
+
+def run_worker(worker, sessions, seed, timeout):
+    """Run ``sessions`` sessions one after another and keep them open until the end."""
+    from measureup.catalogue import load_catalogue
+
+    catalogue = load_catalogue()
+    index = catalogue.index
+    choices = []
+    for name in index.categories:
+        choices.append((name, "Bronze", None))
+        choices.extend((name, "Silver", silver) for silver in index.silver_options[name])
+
+    rng = random.Random(seed + worker)
+    # Warm up imports and caches so they do not count as per-session growth
+    Session(rng, choices, timeout).run()
+    rss_start = rss_bytes()
+
+    alive, timings, state_sizes, errors = [], [], [], []
+    started = time.perf_counter()
+    for _ in range(sessions):
+        session = Session(rng, choices, timeout)
+        try:
+            session.run()
+        except Exception as e:
+            errors.append(f"{type(e).__name__}: {e}")
+        timings.extend(session.timings)
+        state_sizes.append(session_state_bytes(session.at))
+        alive.append(session)
+    elapsed = time.perf_counter() - started
+    return {
+        "worker": worker,
+        "sessions": sessions,
+        "elapsed": elapsed,
+        "timings": timings,
+        "state_sizes": state_sizes,
+        "rss_start": rss_start,
+        "rss_end": rss_bytes(),
+        "errors": errors,
+    }
+
+
+def summarise(results, wall):
+    timings = {}
+    for result in results:
+        for label, seconds in result["timings"]:
+            timings.setdefault(label, []).append(seconds * 1000)
+    pages = {}
+    for label in STEPS:
+        values = np.array(timings.get(label, []))
+        if values.size:
+            pages[label] = {"count": int(values.size), **{f"p{p}_ms": float(np.percentile(values, p)) for p in PERCENTILES}, "max_ms": float(values.max())}
+    everything = np.array([ms for values in timings.values() for ms in values])
+
+    sessions = sum(result["sessions"] for result in results)
+    state_sizes = np.array([size for result in results for size in result["state_sizes"]])
+    growth = [(result["rss_end"] - result["rss_start"]) / result["sessions"] for result in results if result["sessions"]]
+    return {
+        "sessions": sessions,
+        "interactions": int(everything.size),
+        "wall_seconds": wall,
+        "sessions_per_second": sessions / wall,
+        "interactions_per_second": everything.size / wall,
+        "latency": {
+            "all": {**{f"p{p}_ms": float(np.percentile(everything, p)) for p in PERCENTILES}, "max_ms": float(everything.max())} if everything.size else {},
+            "pages": pages,
+        },
+        "memory": {
+            "rss_growth_per_session_bytes": float(np.mean(growth)) if growth else 0.0,
+            "rss_end_bytes": [result["rss_end"] for result in results],
+            "session_state_bytes_mean": float(state_sizes.mean()) if state_sizes.size else 0.0,
+            "session_state_bytes_max": int(state_sizes.max()) if state_sizes.size else 0,
+        },
+        "errors": [error for result in results for error in result["errors"]],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4, help="parallel worker processes (default: 4)")
+    parser.add_argument("--sessions", type=int, default=10, help="sessions per worker (default: 10)")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for the simulated choices")
+    parser.add_argument("--timeout", type=float, default=60, help="seconds allowed per script run (default: 60)")
+    parser.add_argument("--max-p95-ms", type=float, help="fail if the overall p95 latency exceeds this")
+    parser.add_argument("--max-session-bytes", type=int, help="fail if any session state pickles to more than this")
+    parser.add_argument("-o", "--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    # Keep the load test's saved estimates and profiling output away from the real ones
+    scratch = os.path.join(ROOT, ".measureup_cache")
+    os.environ.setdefault("MEASUREUP_DB", os.path.join(scratch, "load_test.db"))
+    profile_file = os.environ.get("MEASUREUP_PROFILE_FILE")
+    if profile_file:
+        os.makedirs(scratch, exist_ok=True)
+        os.environ["MEASUREUP_PROFILE_FILE"] = os.path.join(scratch, "load_test_profile" + os.path.splitext(profile_file)[1])
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = [pool.submit(run_worker, worker, args.sessions, args.seed, args.timeout) for worker in range(args.workers)]
+        results = [future.result() for future in futures]
+    wall = time.perf_counter() - started
+
+    report = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "workers": args.workers,
+        **summarise(results, wall),
+    }
+    failures = list(report["errors"])
+    if args.max_p95_ms is not None and report["latency"]["all"].get("p95_ms", 0) > args.max_p95_ms:
+        failures.append(f"p95 latency {report['latency']['all']['p95_ms']:.1f} ms exceeds {args.max_p95_ms} ms")
+    if args.max_session_bytes is not None and report["memory"]["session_state_bytes_max"] > args.max_session_bytes:
+        failures.append(f"session state {report['memory']['session_state_bytes_max']} bytes exceeds {args.max_session_bytes}")
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    else:
+        print(text)
+    for failure in failures:
+        print(f"FAIL {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,238 @@
+"""Offline benchmarks for the MeasureUp Estimator App.
+
+Times catalogue loading, the page 3 lookups, the page 5 calculations, bulk
+estimation and export, and the page 6 report export against the bundled value_list.xlsx
+and synthetic catalogues scaled up from it. Results are printed (or written)
+as JSON and compared with a stored baseline; the exit status is 1 if any
+benchmark regressed.
+
+    python benchmarks/run_benchmarks.py                       # compare with baseline.json
+    python benchmarks/run_benchmarks.py --scales 1,10,100 -o results.json  # 100x takes minutes
+    python benchmarks/run_benchmarks.py --save-baseline       # refresh baseline.json
+"""
+
+import argparse
+import importlib.util
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from measureup import catalogue as catalogue_module  # noqa: E402
+from measureup.bulk import RESULT_DTYPES, estimate_table  # noqa: E402
+from measureup.catalogue import DEFAULT_EXCEL_PATH, Catalogue, load_catalogue  # noqa: E402
+from measureup.export import write_export  # noqa: E402
+from measureup.engine import IMPACT_LEVELS, VALUE_TYPES, EstimateInputs, estimate  # noqa: E402
+from measureup.report import ReportNotes, report_csv, report_frame, report_items  # noqa: E402
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+BULK_ROWS = 100_000
+EXPORT_CHUNKSIZE = 10_000
+EXPORT_FORMATS = ["csv", "ndjson"] + (["parquet"] if importlib.util.find_spec("pyarrow") else [])
+
+
+def timed(func, repeat):
+    """Run ``func`` ``repeat`` times and return timing statistics in seconds."""
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - started)
+    return {"min": min(times), "median": statistics.median(times), "mean": statistics.fmean(times), "repeat": repeat}
+
+
+def synthetic_frame(frame, scale):
+    """``scale`` copies of the catalogue with distinct Keys and Value names."""
+    if scale == 1:
+        return frame
+    copies = []
+    for i in range(scale):
+        copy = frame.copy()
+        copy["Key"] = copy["Key"].astype("string") + f"-{i}"
+        copy["Value name"] = copy["Value name"].astype("string") + f" #{i}"
+        copies.append(copy)
+    return pd.concat(copies, ignore_index=True)
+
+
+def selections(catalogue):
+    index = catalogue.index
+    result = []
+    for name in index.categories:
+        result.append((name, "Bronze", None))
+        options = index.silver_options[name]
+        result.extend((name, "Silver", silver) for silver in options)
+        if not options:
+            result.append((name, "Silver", None))
+    return result
+
+
+def page3_scan(frame, value_name, level, silver_name):
+    # The boolean filtering page 3 did before the lookup index, kept for comparison
+    categories = sorted(frame["Value name"].dropna().unique())
+    if level == "Silver":
+        rows = frame[frame["Value name"] == value_name]
+        options = [s for s in rows["Silver name"].dropna().unique() if s != "NA"]
+        return categories, options, frame[(frame["Value name"] == value_name) & (frame["Silver name"] == silver_name)]
+    return categories, [], frame[(frame["Value name"] == value_name) & (frame["Level"].str.strip().str.lower() == "bronze")]
+
+
+def bulk_table(catalogue, rows, seed=0):
+    rng = np.random.default_rng(seed)
+    picks = selections(catalogue)
+    chosen = [picks[i] for i in rng.integers(0, len(picks), rows)]
+    return pd.DataFrame({
+        "Value name": [name for name, _, _ in chosen],
+        "Level": [level for _, level, _ in chosen],
+        "Silver name": [silver for _, _, silver in chosen],
+        "Unit 1": rng.integers(1, 100, rows),
+        "Unit 2": rng.choice([0.5, 1.0, 2.0], rows),
+        "Impact level": rng.choice(IMPACT_LEVELS, rows),
+        "Type of monetised value": rng.choice(VALUE_TYPES, rows),
+    })
+
+
+def check_export(table, fmt):
+    """Export ``table`` in chunks and check every row was written."""
+    buffer = io.BytesIO()
+    rows = write_export(table, buffer, fmt, EXPORT_CHUNKSIZE, RESULT_DTYPES)
+    if rows != len(table) or not buffer.getbuffer().nbytes:
+        raise RuntimeError(f"{fmt} export wrote {rows} of {len(table)} rows")
+    if fmt == "parquet":
+        written = pd.read_parquet(io.BytesIO(buffer.getvalue()), columns=["Silver name"])["Silver name"]
+        if written.notna().sum() != table["Silver name"].notna().sum():
+            raise RuntimeError("parquet export lost Silver names after the first chunk")
+
+
+def run_scale(scale, workdir, repeat):
+    results = {}
+    base = pd.read_excel(DEFAULT_EXCEL_PATH)
+    frame = synthetic_frame(base, scale)
+    if scale == 1:
+        path = DEFAULT_EXCEL_PATH
+    else:
+        path = os.path.join(workdir, f"value_list_x{scale}.xlsx")
+        if not os.path.exists(path):
+            frame.to_excel(path, index=False)
+
+    # Loading: openpyxl parse, snapshot load on a cold process cache, warm cache hit
+    parse_repeat = repeat if scale == 1 else 1
+    results["load.parse_xlsx"] = timed(lambda: pd.read_excel(path), parse_repeat)
+    load_catalogue(path)
+
+    def load_from_snapshot():
+        catalogue_module.clear_cache()
+        load_catalogue(path)
+
+    results["load.snapshot"] = timed(load_from_snapshot, repeat)
+    results["load.cached"] = timed(lambda: load_catalogue(path), repeat * 100)
+    results["load.build_indexes"] = timed(lambda: Catalogue(frame=frame, version="bench", path=path), repeat)
+    catalogue = load_catalogue(path)
+
+    # Page 3: category list, Silver options and row lookup for every selectable row
+    picks = selections(catalogue)
+
+    def page3_index():
+        index = catalogue.index
+        return [(index.categories, index.silver_options.get(name, []), catalogue.row((name, level, silver))) for name, level, silver in picks]
+
+    results["page3.lookup_all_selections"] = timed(page3_index, repeat)
+    sample = picks[:: max(1, len(picks) // 50)]
+    results["page3.scan_50_selections"] = timed(lambda: [page3_scan(frame, *pick) for pick in sample], repeat)
+
+    # Page 5: one engine call per selectable row
+    rows = [(catalogue.row(pick), EstimateInputs(level=pick[1], unit1=10, unit2=2, impact_level="Low", value_type="Wellbeing")) for pick in picks]
+    results["page5.estimate_all_selections"] = timed(lambda: [estimate(row, inputs) for row, inputs in rows], repeat)
+
+    # Bulk estimation
+    table = bulk_table(catalogue, BULK_ROWS)
+    results[f"bulk.estimate_{BULK_ROWS}_rows"] = timed(lambda: estimate_table(catalogue, table), repeat)
+
+    # Chunked export. Bronze rows come first, so the first chunk has no Silver names and
+    # typed formats must not take their column types from it.
+    estimated = estimate_table(catalogue, table).sort_values("Level", kind="stable", ignore_index=True)
+    for fmt in EXPORT_FORMATS:
+        results[f"bulk.export_{fmt}_{BULK_ROWS}_rows"] = timed(lambda: check_export(estimated, fmt), repeat)
+
+    # Page 6: build the report and serialise it to CSV
+    row, inputs = rows[0]
+    result = estimate(row, inputs)
+    notes = ReportNotes(stakeholders="Local residents", activity="Employment support", outcomes="People move into work")
+
+    def page6_report():
+        report_csv(report_frame(report_items(row, picks[0][0], picks[0][2], inputs, result, notes)))
+
+    results["page6.report_csv"] = timed(page6_report, repeat * 10)
+    return {f"x{scale}.{name}": stats for name, stats in results.items()}
+
+
+def compare(results, baseline, tolerance, floor):
+    """Names of benchmarks whose median is slower than baseline by more than ``tolerance``."""
+    regressions = []
+    for name, stats in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        limit = max(reference["median"] * tolerance, reference["median"] + floor)
+        if stats["median"] > limit:
+            regressions.append({"name": name, "baseline": reference["median"], "median": stats["median"], "ratio": stats["median"] / reference["median"]})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", default="1,10", help="comma separated catalogue scale factors, e.g. 1,10,100 (default: 1,10)")
+    parser.add_argument("--repeat", type=int, default=5, help="repetitions per benchmark (default: 5)")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="baseline JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=1.5, help="allowed slowdown factor before flagging (default: 1.5)")
+    parser.add_argument("--floor", type=float, default=0.002, help="ignore slowdowns smaller than this many seconds (default: 0.002)")
+    parser.add_argument("-o", "--output", help="write the JSON results here instead of stdout")
+    args = parser.parse_args(argv)
+
+    scales = [int(scale) for scale in args.scales.split(",") if scale]
+    with tempfile.TemporaryDirectory() as workdir:
+        # Keep snapshots of the synthetic workbooks out of the repo
+        os.environ["MEASUREUP_CACHE_DIR"] = os.path.join(workdir, "cache")
+        results = {}
+        for scale in scales:
+            results.update(run_scale(scale, workdir, args.repeat))
+
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, encoding="utf-8") as fh:
+            baseline = json.load(fh)["results"]
+    regressions = compare(results, baseline, args.tolerance, args.floor)
+
+    report = {
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "results": results,
+        "regressions": regressions,
+    }
+    text = json.dumps(report, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    else:
+        print(text)
+
+    for regression in regressions:
+        print(f"REGRESSION {regression['name']}: {regression['median']:.6f}s vs baseline {regression['baseline']:.6f}s ({regression['ratio']:.2f}x)", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
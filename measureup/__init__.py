@@ -0,0 +1,7 @@
+"""Streamlit-free building blocks of the MeasureUp Estimator App."""
+
+from measureup.bulk import estimate_table
+from measureup.catalogue import Catalogue, load_catalogue
+from measureup.engine import EstimateInputs, EstimateResult, estimate
+
+__all__ = ["Catalogue", "EstimateInputs", "EstimateResult", "estimate", "estimate_table", "load_catalogue"]
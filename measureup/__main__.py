@@ -0,0 +1,5 @@
+import sys
+
+from measureup.cli import main
+
+sys.exit(main())
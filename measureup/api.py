@@ -0,0 +1,245 @@
+"""Small asyncio HTTP/JSON API over the catalogue and the estimation engine.
+
+Run with ``python -m measureup serve``. Endpoints:
+
+    GET  /health
+    GET  /catalogue                 Value names with their Silver options (``?q=`` ranks by search)
+    GET  /catalogue/row             one row, by ``value_name``, ``level`` and ``silver_name``
+    POST /estimate                  one estimate, same fields as the wizard
+    POST /estimate/batch            ``{"items": [...]}``, rows as accepted by the Bulk Estimate page
+
+Uses only the standard library and keeps connections alive, so internal
+tools can call it at high rates without a Streamlit session per user.
+"""
+
+import asyncio
+import json
+import math
+import sys
+from dataclasses import asdict
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+
+from measureup.bulk import estimate_table
+from measureup.catalogue import DEFAULT_EXCEL_PATH, current_catalogue, start_watcher
+from measureup.engine import IMPACT_LEVELS, LEVELS, VALUE_TYPES, EstimateInputs, estimate
+
+MAX_BODY_BYTES = 16 * 1024 * 1024
+MAX_HEADER_LINES = 100
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _json_safe(value):
+    # NaN and numpy scalars are not valid JSON
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if hasattr(value, "item"):
+        return _json_safe(value.item())
+    return value
+
+
+def _row_json(row):
+    return {column: _json_safe(value) for column, value in row.items()}
+
+
+def _number(payload, field, default):
+    value = payload.get(field, default)
+    # json.loads accepts NaN and Infinity, which cannot be echoed back as JSON
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise ApiError(400, f"'{field}' must be a number")
+    if value < 0:
+        raise ApiError(400, f"'{field}' must not be negative")
+    return value
+
+
+def _choice(payload, field, choices, default):
+    value = payload.get(field, default)
+    if value not in choices:
+        raise ApiError(400, f"'{field}' must be one of {choices}")
+    return value
+
+
+class EstimationApi:
+    def __init__(self, catalogue_path=DEFAULT_EXCEL_PATH):
+        self.catalogue_path = catalogue_path
+        self.routes = {
+            ("GET", "/health"): self.health,
+            ("GET", "/catalogue"): self.list_values,
+            ("GET", "/catalogue/row"): self.get_row,
+            ("POST", "/estimate"): self.estimate_one,
+            ("POST", "/estimate/batch"): self.estimate_batch,
+        }
+
+    @property
+    def catalogue(self):
+        # Latest published version; the watcher started by serve() reloads it off the request path
+        return current_catalogue(self.catalogue_path)
+
+    async def health(self, query, body):
+        catalogue = self.catalogue
+        return {"status": "ok", "catalogue_version": catalogue.version, "catalogue_issues": len(catalogue.issues)}
+
+    async def list_values(self, query, body):
+        catalogue = self.catalogue
+        index = catalogue.index
+        search = query.get("q", "").strip()
+        if search:
+            try:
+                limit = int(query.get("limit", 20))
+            except ValueError:
+                raise ApiError(400, "'limit' must be an integer")
+            if limit < 1:
+                raise ApiError(400, "'limit' must be at least 1")
+            names = [match.value_name for match in catalogue.search.search(search, limit=limit)]
+        else:
+            names = index.categories
+        return {
+            "catalogue_version": catalogue.version,
+            "values": [
+                {"value_name": name, "silver_options": index.silver_options.get(name, []), "silver_adjustment_factors": index.silver_factors.get(name, [])}
+                for name in names
+            ],
+        }
+
+    async def get_row(self, query, body):
+        catalogue = self.catalogue
+        selection = (query.get("value_name"), _choice(query, "level", LEVELS, "Bronze"), query.get("silver_name") or None)
+        row = catalogue.row(selection)
+        if row is None:
+            raise ApiError(404, "No catalogue row for this selection")
+        return {"catalogue_version": catalogue.version, "row": _row_json(row)}
+
+    async def estimate_one(self, query, body):
+        payload = self._json_body(body)
+        if not isinstance(payload, dict):
+            raise ApiError(400, "Expected a JSON object")
+        inputs = EstimateInputs(
+            level=_choice(payload, "level", LEVELS, "Bronze"),
+            unit1=_number(payload, "unit1", 0),
+            unit2=_number(payload, "unit2", 1),
+            impact_level=_choice(payload, "impact_level", IMPACT_LEVELS, "Low"),
+            value_type=_choice(payload, "value_type", VALUE_TYPES, "Economic"),
+        )
+        catalogue = self.catalogue
+        row = catalogue.row((payload.get("value_name"), inputs.level, payload.get("silver_name") or None))
+        if row is None:
+            raise ApiError(404, "No catalogue row for this selection")
+        return {
+            "catalogue_version": catalogue.version,
+            "key": _json_safe(row.get("Key")),
+            "inputs": asdict(inputs),
+            "result": {field: _json_safe(value) for field, value in asdict(estimate(row, inputs)).items()},
+        }
+
+    async def estimate_batch(self, query, body):
+        payload = self._json_body(body)
+        items = payload.get("items") if isinstance(payload, dict) else None
+        if not isinstance(items, list):
+            raise ApiError(400, "Expected {\"items\": [...]}")
+        catalogue = self.catalogue
+        if not items:
+            # A frame built from no rows has no columns, which estimate_table would reject
+            return {"catalogue_version": catalogue.version, "results": []}
+        try:
+            # Large batches are NumPy-bound; keep the event loop free for other requests
+            results = await asyncio.get_running_loop().run_in_executor(None, estimate_table, catalogue, pd.DataFrame(items))
+        except ValueError as e:
+            raise ApiError(400, str(e))
+        return {"catalogue_version": catalogue.version, "results": json.loads(results.to_json(orient="records", force_ascii=False))}
+
+    @staticmethod
+    def _json_body(body):
+        try:
+            return json.loads(body or b"{}")
+        except ValueError:
+            raise ApiError(400, "Body is not valid JSON")
+
+    async def dispatch(self, method, target, body):
+        url = urlsplit(target)
+        path = url.path.rstrip("/") or "/"
+        handler = self.routes.get((method, path))
+        if handler is None:
+            if any(route_path == path for _, route_path in self.routes):
+                raise ApiError(405, f"{method} not allowed on {path}")
+            raise ApiError(404, f"No such endpoint: {path}")
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        return await handler(query, body)
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "Malformed request line"}, keep_alive=False)
+                    break
+
+                headers = {}
+                for _ in range(MAX_HEADER_LINES):
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                try:
+                    length = int(headers.get("content-length") or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    await self._respond(writer, 400, {"error": "Invalid Content-Length"}, keep_alive=False)
+                    break
+                if length > MAX_BODY_BYTES:
+                    await self._respond(writer, 413, {"error": "Request body too large"}, keep_alive=False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                try:
+                    status, payload = 200, await self.dispatch(method.upper(), target, body)
+                except ApiError as e:
+                    status, payload = e.status, {"error": e.message}
+                except Exception as e:
+                    status, payload = 500, {"error": f"{type(e).__name__}: {e}"}
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer, status, payload, keep_alive):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        head = (
+            f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+
+async def serve(host="127.0.0.1", port=8000, catalogue_path=DEFAULT_EXCEL_PATH):
+    api = EstimationApi(catalogue_path)
+    # Parse the workbook before accepting requests rather than on the first one
+    current_catalogue(catalogue_path)
+    start_watcher(catalogue_path)
+    server = await asyncio.start_server(api.handle_connection, host, port)
+    print(f"MeasureUp API listening on http://{host}:{port}", file=sys.stderr)
+    async with server:
+        await server.serve_forever()
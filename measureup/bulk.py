@@ -0,0 +1,243 @@
+"""Vectorised estimation of many activities at once.
+
+Takes a table with one activity per row, joins it against the value
+catalogue and applies the same formulas as ``measureup.engine.estimate``
+column-wise, so a 100k row portfolio costs one pass of NumPy arithmetic.
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+from measureup.engine import IMPACT_DISCOUNT_MAPPING, LEVEL_VALUE_COLUMNS, VALUE_TYPE_COLUMN_MAPPING, VALUE_TYPES, find_column, unit2_years
+
+# Input column -> accepted headers (matched stripped and lower-cased)
+INPUT_COLUMNS = {
+    "Key": ["key"],
+    "Value name": ["value name", "selected value name"],
+    "Level": ["level"],
+    "Silver name": ["silver name", "silver level"],
+    "Unit 1": ["unit 1"],
+    "Unit 2": ["unit 2"],
+    "Impact level": ["impact level", "impact discount level"],
+    "Type of monetised value": ["type of monetised value", "value type"],
+}
+INPUT_DEFAULTS = {"Level": "Bronze", "Unit 1": 0, "Unit 2": 1, "Impact level": "Low", "Type of monetised value": "Economic"}
+
+RESULT_COLUMNS = [
+    "Matched Key",
+    "Matched Value name",
+    "Base Value Per Unit (£)",
+    "Impact Discount (decimal)",
+    "Monetised Value Per Unit (£)",
+    "Total Monetised Value (£)",
+    "Base Value By Type (£)",
+    "Total Monetised Value By Type (£)",
+    "Total kg CO2",
+    "Total WELLBYs",
+    "Unit 2 Applied",
+    "Duration (years)",
+    "Status",
+]
+
+# Column types of an estimate_table result, for typed exports such as Parquet
+TEXT_INPUT_COLUMNS = ["Key", "Value name", "Level", "Silver name", "Impact level", "Type of monetised value"]
+RESULT_DTYPES = {
+    **{name: "string" for name in TEXT_INPUT_COLUMNS},
+    "Unit 1": "float64",
+    "Unit 2": "float64",
+    **{name: "float64" for name in RESULT_COLUMNS},
+    "Matched Key": "string",
+    "Matched Value name": "string",
+    "Status": "string",
+}
+
+STATUS_OK = "ok"
+
+
+def _text(table, column):
+    if column not in table.columns:
+        return pd.Series(pd.NA, index=table.index, dtype="string")
+    return table[column].astype("string").str.strip()
+
+
+class _LookupTables:
+    """Catalogue columns as NumPy arrays plus join indexes, built once per catalogue version."""
+
+    def __init__(self, catalogue):
+        frame = catalogue.frame
+        index = catalogue.index
+        n = len(frame)
+
+        # The catalogue is stripped when it loads; input labels are stripped in normalise_inputs
+        names = _text(frame, "Value name")
+        keys = _text(frame, "Key")
+        levels = _text(frame, "Level").str.lower()
+        silvers = _text(frame, "Silver name").fillna("")
+        positions = np.arange(n)
+
+        # Silver selections for a value without Silver rows fall back to its first row, as on page 3
+        no_silver = [name for name, options in index.silver_options.items() if not options]
+        fallback_names = [index.first_row[name] for name in no_silver]
+        fallback_keys = np.flatnonzero(names.isin(no_silver).to_numpy())
+        fallback_keys = fallback_keys[~keys.iloc[fallback_keys].duplicated().to_numpy()]
+
+        self.by_name = self._join_index(
+            [names, pd.Series(no_silver, dtype="string").str.strip()],
+            [levels, pd.Series(["silver"] * len(no_silver), dtype="string")],
+            [silvers, pd.Series([""] * len(no_silver), dtype="string")],
+            [positions, np.asarray(fallback_names, dtype=int)],
+        )
+        self.by_key = self._join_index(
+            [keys, keys.iloc[fallback_keys]],
+            [levels, pd.Series(["silver"] * len(fallback_keys), dtype="string")],
+            [silvers, pd.Series([""] * len(fallback_keys), dtype="string")],
+            [positions, fallback_keys],
+        )
+
+        self.keys = frame["Key"].to_numpy(dtype=object) if "Key" in frame.columns else np.full(n, None)
+        self.names = frame["Value name"].to_numpy(dtype=object)
+        self.has_unit2 = frame["Unit 2"].notna().to_numpy() if "Unit 2" in frame.columns else np.zeros(n, dtype=bool)
+        # Years per Unit 2, NaN where Unit 2 is not a duration
+        labels = frame["Unit 2"] if "Unit 2" in frame.columns else pd.Series(None, index=frame.index, dtype=object)
+        self.unit2_years = np.array([unit2_years(label) for label in labels], dtype=float)
+        self.level_values = {level.lower(): self._numeric(frame, column) for level, column in LEVEL_VALUE_COLUMNS.items()}
+        self.type_values = np.column_stack([self._numeric(frame, VALUE_TYPE_COLUMN_MAPPING[value_type]) for value_type in VALUE_TYPES])
+        self.type_present = np.array([VALUE_TYPE_COLUMN_MAPPING[value_type] in frame.columns for value_type in VALUE_TYPES])
+        self.kg_co2 = self._numeric(frame, "kg CO2e")
+        self.wellby = self._numeric(frame, "WELLBY")
+
+    @staticmethod
+    def _join_index(names, levels, silvers, positions):
+        labels = pd.MultiIndex.from_arrays([
+            pd.concat(names, ignore_index=True),
+            pd.concat(levels, ignore_index=True),
+            pd.concat(silvers, ignore_index=True),
+        ])
+        positions = np.concatenate(positions)
+        keep = ~labels.duplicated()
+        return pd.Series(positions[keep], index=labels[keep])
+
+    @staticmethod
+    def _numeric(frame, column):
+        # Value columns are float64 with NaN for blanks (see measureup.catalogue.normalise_frame)
+        if column not in frame.columns:
+            return np.zeros(len(frame))
+        return np.nan_to_num(frame[column].to_numpy(dtype=float))
+
+
+_tables = None
+_tables_lock = threading.Lock()
+
+
+def _lookup_tables(catalogue):
+    global _tables
+    with _tables_lock:
+        if _tables is None or _tables[0] != catalogue.version:
+            _tables = (catalogue.version, _LookupTables(catalogue))
+        return _tables[1]
+
+
+def input_renames(columns):
+    """Recognised headers in ``columns`` -> the ``INPUT_COLUMNS`` names they stand for."""
+    renames = {}
+    for name, aliases in INPUT_COLUMNS.items():
+        for alias in aliases:
+            col = find_column(columns, alias)
+            if col is not None:
+                renames[col] = name
+                break
+    return renames
+
+
+def normalise_inputs(table):
+    """Rename recognised headers to ``INPUT_COLUMNS`` names and fill in defaults."""
+    table = table.rename(columns=input_renames(table.columns))
+    if "Key" not in table.columns and "Value name" not in table.columns:
+        raise ValueError("Input needs a 'Key' or 'Value name' column")
+    for name, default in INPUT_DEFAULTS.items():
+        if name not in table.columns:
+            table[name] = default
+        else:
+            table[name] = table[name].fillna(default)
+    return table
+
+
+def _finite(values):
+    return np.where(np.isfinite(values), values, np.nan)
+
+
+def estimate_table(catalogue, table):
+    """Estimate every row of ``table`` and return it with ``RESULT_COLUMNS`` appended.
+
+    Rows are matched by Key when one is given, otherwise by Value name, then by
+    Level and Silver name. Rows that cannot be matched, carry an unknown
+    impact level or value type, or have a Unit 1 or (where the catalogue row
+    uses it) Unit 2 that is not a finite number of at least 0 get NaN results
+    and a descriptive Status.
+    """
+    tables = _lookup_tables(catalogue)
+    table = normalise_inputs(table)
+
+    levels = _text(table, "Level").str.lower()
+    silvers = _text(table, "Silver name").fillna("").where(levels == "silver", "")
+    keys = _text(table, "Key")
+    names = _text(table, "Value name")
+
+    by_key = tables.by_key.reindex(pd.MultiIndex.from_arrays([keys, levels, silvers])).to_numpy()
+    by_name = tables.by_name.reindex(pd.MultiIndex.from_arrays([names, levels, silvers])).to_numpy()
+    pos = np.where(keys.notna().to_numpy(), by_key, by_name)
+    matched = ~np.isnan(pos)
+    pos = np.where(matched, pos, 0).astype(int)
+
+    discount = table["Impact level"].map(IMPACT_DISCOUNT_MAPPING).to_numpy(dtype=float)
+    type_idx = table["Type of monetised value"].map({value_type: i for i, value_type in enumerate(VALUE_TYPES)}).to_numpy(dtype=float)
+    known_type = ~np.isnan(type_idx)
+    type_idx = np.where(known_type, type_idx, 0).astype(int)
+    # Infinite units are invalid like unparseable ones (see the Status checks below)
+    unit1 = _finite(pd.to_numeric(table["Unit 1"], errors="coerce").to_numpy(dtype=float))
+    unit2_input = _finite(pd.to_numeric(table["Unit 2"], errors="coerce").to_numpy(dtype=float))
+    # Unit 2 only counts, and so only needs to be valid, where the catalogue row has one
+    uses_unit2 = tables.has_unit2[pos]
+    unit2 = np.where(uses_unit2, unit2_input, 1.0)
+
+    level_lower = levels.fillna("").to_numpy(dtype=object)
+    base_value = np.select(
+        [level_lower == level for level in tables.level_values],
+        [values[pos] for values in tables.level_values.values()],
+        default=np.nan,
+    )
+    factor = 1 - discount
+    quantity = unit1 * unit2 * factor
+    by_type = np.where(tables.type_present[type_idx], tables.type_values[pos, type_idx], 0.0)
+    kg_co2 = np.where(type_idx == VALUE_TYPES.index("Environmental"), tables.kg_co2[pos] * quantity, 0.0)
+    wellby = np.where(type_idx == VALUE_TYPES.index("Wellbeing"), tables.wellby[pos] * quantity, 0.0)
+
+    status = np.full(len(table), STATUS_OK, dtype=object)
+    status[~known_type] = "unknown value type"
+    status[np.isnan(discount)] = "unknown impact level"
+    # Units must be finite numbers of at least 0, as on page 4
+    status[np.isnan(unit1) | (unit1 < 0)] = "invalid Unit 1"
+    status[uses_unit2 & (np.isnan(unit2_input) | (unit2_input < 0))] = "invalid Unit 2"
+    status[~matched] = "no matching catalogue row"
+    ok = status == STATUS_OK
+
+    out = table.copy()
+    out["Matched Key"] = np.where(matched, tables.keys[pos], None)
+    out["Matched Value name"] = np.where(matched, tables.names[pos], None)
+    out["Base Value Per Unit (£)"] = np.where(ok, base_value, np.nan)
+    out["Impact Discount (decimal)"] = discount
+    out["Monetised Value Per Unit (£)"] = np.where(ok, base_value * factor, np.nan)
+    out["Total Monetised Value (£)"] = np.where(ok, base_value * quantity, np.nan)
+    out["Base Value By Type (£)"] = np.where(ok, by_type, np.nan)
+    out["Total Monetised Value By Type (£)"] = np.where(ok, by_type * quantity, np.nan)
+    out["Total kg CO2"] = np.where(ok, kg_co2, np.nan)
+    out["Total WELLBYs"] = np.where(ok, wellby, np.nan)
+    # The Unit 2 multiplier actually used: 1 when the catalogue row has no Unit 2
+    out["Unit 2 Applied"] = np.where(ok, unit2, np.nan)
+    # Years the value is spread over by measureup.projection
+    years_per_unit = tables.unit2_years[pos]
+    out["Duration (years)"] = np.where(ok, np.where(np.isnan(years_per_unit), 1.0, unit2 * years_per_unit), np.nan)
+    out["Status"] = status
+    return out
@@ -0,0 +1,434 @@
+"""Loading and caching of the MeasureUp value catalogue (value_list.xlsx).
+
+The workbook is parsed once per process and shared by every session. A
+pickled snapshot of the parsed frame is kept on disk next to the workbook so
+a cold start does not need to go through openpyxl again. A background
+watcher can reload a replaced workbook without a restart. Each loaded
+catalogue carries a lookup index so the pages never scan the frame, and a
+search index for ranking Value names against free text.
+
+Freshly parsed workbooks go through ``normalise_frame`` once: headers are
+mapped to their canonical spelling, text is stripped with "NA" read as
+blank, and the value columns become float64 (NaN where blank). Cells that
+could not be read are reported as ``SchemaIssue``s on the catalogue instead
+of being checked again on every use.
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from measureup.search import SearchIndex
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_EXCEL_PATH = os.path.join(BASE_DIR, "value_list.xlsx")
+
+# Bump when the snapshot layout changes so stale snapshots are ignored
+SNAPSHOT_FORMAT = 2
+SNAPSHOT_DIR_NAME = ".measureup_cache"
+
+REQUIRED_COLUMNS = ["Value name", "Level"]
+# Canonical headers; workbook headers match them ignoring case and surrounding spaces
+TEXT_COLUMNS = [
+    "Key", "Wellbeing Category (from ONS)", "Level", "Value name", "Silver adjustment factors",
+    "Silver name", "Description", "Unit 1", "Unit 2", "Value type", "URL",
+]
+NUMERIC_COLUMNS = ["Bronze Value", "Silver values", "Fiscal", "Economic", "Social", "Environmental", "kg CO2e", "WELLBY"]
+LEVEL_NAMES = {"bronze": "Bronze", "silver": "Silver"}
+# Text read as a blank cell
+NULL_TEXT = {"", "NA", "N/A", "n/a"}
+# Versions kept for sessions that started on an older catalogue
+RETAINED_VERSIONS = 4
+# Seconds between checks of the workbook for changes
+WATCH_INTERVAL = float(os.environ.get("MEASUREUP_WATCH_INTERVAL", "5"))
+
+
+class CatalogueError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class SchemaIssue:
+    """A cell the loader could not read; the row is kept with the cell left blank."""
+
+    # Spreadsheet row number, the header being row 1
+    row: int
+    column: str
+    value: object
+    problem: str
+
+    def __str__(self):
+        return f"row {self.row}, {self.column}: {self.problem} ({self.value!r})"
+
+
+def _clean(value):
+    return None if pd.isna(value) else value
+
+
+class CatalogueIndex:
+    """Lookups over the catalogue frame, built once when the catalogue loads.
+
+    Rows are keyed by (value name, level, silver name) where level is
+    normalised to "bronze"/"silver" and silver name is None for Bronze rows.
+    Values are row positions in the frame; the first matching row wins, as
+    the pages always took ``.iloc[0]`` of the matching slice.
+    """
+
+    def __init__(self, frame):
+        self.rows = {}
+        self.first_row = {}
+        self.silver_options = {}
+        self.silver_factors = {}
+
+        names = frame["Value name"].tolist()
+        levels = frame["Level"].astype("string").str.strip().str.lower().tolist()
+        silvers = frame["Silver name"].tolist() if "Silver name" in frame.columns else [None] * len(frame)
+        factors = frame["Silver adjustment factors"].tolist() if "Silver adjustment factors" in frame.columns else [None] * len(frame)
+
+        for pos, (name, level, silver, factor) in enumerate(zip(names, levels, silvers, factors)):
+            name, level, silver, factor = _clean(name), _clean(level), _clean(silver), _clean(factor)
+            if name is None:
+                continue
+            self.rows.setdefault((name, level, silver), pos)
+            self.first_row.setdefault(name, pos)
+            options = self.silver_options.setdefault(name, [])
+            if silver is not None and silver not in options:
+                options.append(silver)
+            category_factors = self.silver_factors.setdefault(name, [])
+            if factor is not None and factor not in category_factors:
+                category_factors.append(factor)
+
+        self.categories = sorted(self.first_row)
+
+    def lookup(self, value_name, level, silver_name=None):
+        """Return the row position for a selection, or None if there is no such row."""
+        return self.rows.get((value_name, level.strip().lower(), silver_name))
+
+    def resolve(self, selection):
+        """Row position for a page 3 selection of (value name, level, silver name).
+
+        A Silver selection for a value without Silver rows falls back to the
+        value's first row, as page 3 shows its Description and Bronze value.
+        """
+        if selection is None:
+            return None
+        value_name, level, silver_name = selection
+        if level.strip().lower() == "silver" and not self.silver_options.get(value_name):
+            return self.first_row.get(value_name)
+        return self.lookup(value_name, level, silver_name)
+
+
+class CatalogueRow(Mapping):
+    """Read-only view of one catalogue row, shared by every session.
+
+    Behaves as a mapping of column name to cell value so it can be passed
+    straight to ``measureup.engine.estimate``.
+    """
+
+    __slots__ = ("position", "_values", "_columns")
+
+    def __init__(self, position, values, columns):
+        self.position = position
+        self._values = values
+        # column name -> index into values, shared by all rows of a catalogue
+        self._columns = columns
+
+    def __getitem__(self, column):
+        return self._values[self._columns[column]]
+
+    def __iter__(self):
+        return iter(self._columns)
+
+    def __len__(self):
+        return len(self._columns)
+
+    def __contains__(self, column):
+        return column in self._columns
+
+    def __repr__(self):
+        return f"CatalogueRow({self.position}, Key={self.get('Key')!r})"
+
+
+@dataclass(frozen=True)
+class Catalogue:
+    frame: pd.DataFrame
+    version: str
+    path: str
+    issues: tuple = ()
+    index: CatalogueIndex = field(init=False, repr=False, compare=False)
+    search: SearchIndex = field(init=False, repr=False, compare=False)
+    records: tuple = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "index", CatalogueIndex(self.frame))
+        object.__setattr__(self, "search", SearchIndex(self.frame))
+        columns = {col: i for i, col in enumerate(self.frame.columns)}
+        records = tuple(
+            CatalogueRow(pos, values, columns)
+            for pos, values in enumerate(self.frame.itertuples(index=False, name=None))
+        )
+        object.__setattr__(self, "records", records)
+
+    def row(self, selection):
+        """Shared record for a (value name, level, silver name) selection, or None."""
+        pos = self.index.resolve(selection)
+        return self.records[pos] if pos is not None else None
+
+
+# path -> (mtime_ns, size, Catalogue) of the latest published catalogue
+_loaded = {}
+# version -> Catalogue, recent versions that sessions may still be pinned to
+_retained = OrderedDict()
+_lock = threading.RLock()
+
+
+def _file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _snapshot_dir(path):
+    return os.environ.get("MEASUREUP_CACHE_DIR") or os.path.join(os.path.dirname(path), SNAPSHOT_DIR_NAME)
+
+
+def _snapshot_path(path, version):
+    name = f"{os.path.splitext(os.path.basename(path))[0]}-{version[:16]}-f{SNAPSHOT_FORMAT}-pd{pd.__version__}.pkl"
+    return os.path.join(_snapshot_dir(path), name)
+
+
+def _read_snapshot(snapshot_path):
+    """The (frame, issues) pair stored by ``_write_snapshot``, or None."""
+    try:
+        with open(snapshot_path, "rb") as fh:
+            snapshot = pickle.load(fh)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+    if isinstance(snapshot, tuple) and len(snapshot) == 2 and isinstance(snapshot[0], pd.DataFrame):
+        return snapshot
+    return None
+
+
+def _write_snapshot(snapshot_path, snapshot):
+    # Write to a temp file and rename so concurrent processes never see a partial snapshot
+    try:
+        os.makedirs(os.path.dirname(snapshot_path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(snapshot_path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as fh:
+            pickle.dump(snapshot, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, snapshot_path)
+    except OSError:
+        # A read-only deployment still works, it just parses the workbook on cold start
+        pass
+
+
+def validate_frame(frame):
+    """Raise CatalogueError if ``frame`` cannot serve as the value catalogue."""
+    missing = [col for col in REQUIRED_COLUMNS if col not in frame.columns]
+    if missing:
+        raise CatalogueError(f"Value list is missing required columns: {', '.join(missing)}")
+    duplicated = sorted(set(frame.columns[frame.columns.duplicated()]))
+    if duplicated:
+        raise CatalogueError(f"Value list has duplicate columns: {', '.join(map(str, duplicated))}")
+    if frame["Value name"].notna().sum() == 0:
+        raise CatalogueError("Value list has no rows with a Value name")
+
+
+def _text_column(values):
+    # Stripped strings with blanks and "NA" as NaN
+    text = values.astype(object).where(values.isna(), values.astype(str).str.strip())
+    return text.where(~text.isin(NULL_TEXT))
+
+
+def _numeric_column(values):
+    """float64 version of ``values`` and a mask of the cells that were not numbers."""
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        return values.astype("float64"), np.zeros(len(values), dtype=bool)
+    text = _text_column(values)
+    # Allow "£1,200" style cells
+    numbers = pd.to_numeric(text.str.replace(r"[£,]", "", regex=True), errors="coerce").astype("float64")
+    return numbers, (numbers.isna() & text.notna()).to_numpy()
+
+
+def normalise_frame(frame):
+    """Canonical headers and column types for a parsed value list.
+
+    Returns ``(frame, issues)`` where issues is a tuple of SchemaIssue for
+    unreadable cells and rows the pages cannot offer. Raises CatalogueError
+    if the frame cannot be used at all.
+    """
+    canonical = {col.lower(): col for col in TEXT_COLUMNS + NUMERIC_COLUMNS}
+    frame = frame.rename(columns=lambda col: canonical.get(col.strip().lower(), col.strip()) if isinstance(col, str) else col)
+    validate_frame(frame)
+
+    frame = frame.copy()
+    issues = []
+    for col in TEXT_COLUMNS:
+        if col in frame.columns:
+            frame[col] = _text_column(frame[col])
+    for col in NUMERIC_COLUMNS:
+        if col in frame.columns:
+            raw = frame[col]
+            frame[col], bad = _numeric_column(raw)
+            issues += [SchemaIssue(int(pos) + 2, col, raw.iloc[pos], "not a number") for pos in np.flatnonzero(bad)]
+
+    levels = frame["Level"].map(lambda level: LEVEL_NAMES.get(level.lower()) if isinstance(level, str) else None)
+    for pos in np.flatnonzero((levels.isna() & frame["Level"].notna()).to_numpy()):
+        issues.append(SchemaIssue(int(pos) + 2, "Level", frame["Level"].iloc[pos], "not Bronze or Silver"))
+    frame["Level"] = levels.where(levels.notna(), frame["Level"])
+    for pos in np.flatnonzero(frame["Value name"].isna().to_numpy()):
+        issues.append(SchemaIssue(int(pos) + 2, "Value name", None, "missing, row is ignored"))
+
+    issues.sort(key=lambda issue: issue.row)
+    return frame, tuple(issues)
+
+
+def _parse(path, version):
+    snapshot_path = _snapshot_path(path, version)
+    snapshot = _read_snapshot(snapshot_path)
+    if snapshot is None:
+        snapshot = normalise_frame(pd.read_excel(path))
+        _write_snapshot(snapshot_path, snapshot)
+    frame, issues = snapshot
+    return Catalogue(frame=frame, version=version, path=path, issues=issues)
+
+
+def _publish(path, stat, catalogue):
+    # Callers hold _lock
+    _loaded[path] = (stat.st_mtime_ns, stat.st_size, catalogue)
+    _retained[catalogue.version] = catalogue
+    _retained.move_to_end(catalogue.version)
+    while len(_retained) > RETAINED_VERSIONS:
+        _retained.popitem(last=False)
+
+
+def load_catalogue(path=DEFAULT_EXCEL_PATH):
+    """Return the catalogue for ``path``, reparsing only when the file changed."""
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    with _lock:
+        cached = _loaded.get(path)
+        if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2]
+        version = _file_digest(path)
+        if cached is not None and cached[2].version == version:
+            catalogue = cached[2]
+        else:
+            catalogue = _parse(path, version)
+        _publish(path, stat, catalogue)
+        return catalogue
+
+
+def current_catalogue(path=DEFAULT_EXCEL_PATH, version=None):
+    """The catalogue to serve a request with, without touching the workbook.
+
+    Returns the retained catalogue ``version`` if given and still held, so a
+    session keeps one consistent snapshot across reruns; otherwise the latest
+    published one. Only the very first call for ``path`` parses in the
+    caller's thread; later changes are picked up by ``start_watcher``.
+    """
+    path = os.path.abspath(path)
+    with _lock:
+        if version is not None and version in _retained:
+            return _retained[version]
+        cached = _loaded.get(path)
+        if cached is not None:
+            return cached[2]
+    return load_catalogue(path)
+
+
+def retained_versions():
+    with _lock:
+        return list(_retained)
+
+
+class CatalogueWatcher(threading.Thread):
+    """Polls the workbook and swaps in a new catalogue when it changes.
+
+    Parsing and validation run on a worker thread; the new catalogue is
+    published in one step under the lock, so readers see either the old
+    or the new version. A workbook that fails to parse or validate is
+    ignored (see ``last_error``) and the previous catalogue stays live.
+    """
+
+    def __init__(self, path, interval=WATCH_INTERVAL):
+        super().__init__(name=f"catalogue-watcher:{os.path.basename(path)}", daemon=True)
+        self.path = os.path.abspath(path)
+        self.interval = interval
+        self.last_error = None
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="catalogue-reload")
+        self._pending = None
+        self._stop = threading.Event()
+
+    def run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def stop(self):
+        self._stop.set()
+        self._pool.shutdown(wait=False)
+
+    def check(self):
+        """Start a reload if the workbook changed; returns the pending future, if any."""
+        if self._pending is not None and not self._pending.done():
+            return self._pending
+        try:
+            stat = os.stat(self.path)
+        except OSError as e:
+            self.last_error = e
+            return None
+        with _lock:
+            cached = _loaded.get(self.path)
+        if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return None
+        self._pending = self._pool.submit(self._reload, stat)
+        return self._pending
+
+    def _reload(self, stat):
+        with _lock:
+            cached = _loaded.get(self.path)
+        try:
+            version = _file_digest(self.path)
+            catalogue = cached[2] if cached is not None and cached[2].version == version else _parse(self.path, version)
+        except Exception as e:
+            self.last_error = e
+            # Remember the stat so a broken workbook is not reparsed on every tick
+            with _lock:
+                if cached is not None:
+                    _loaded[self.path] = (stat.st_mtime_ns, stat.st_size, cached[2])
+            return None
+        with _lock:
+            _publish(self.path, stat, catalogue)
+        self.last_error = None
+        return catalogue
+
+
+_watchers = {}
+
+
+def start_watcher(path=DEFAULT_EXCEL_PATH, interval=WATCH_INTERVAL):
+    """Start (once per path and process) the background watcher for ``path``."""
+    path = os.path.abspath(path)
+    with _lock:
+        watcher = _watchers.get(path)
+        if watcher is None:
+            watcher = _watchers[path] = CatalogueWatcher(path, interval)
+            watcher.start()
+        return watcher
+
+
+def clear_cache():
+    with _lock:
+        _loaded.clear()
+        _retained.clear()
@@ -0,0 +1,198 @@
+"""Command-line entry point.
+
+``python -m measureup estimate input.csv -o out.parquet`` reads and estimates
+the input in chunks so memory stays bounded however large the file is;
+``--workers`` spreads chunks across processes. ``python -m measureup serve``
+runs the HTTP/JSON API from ``measureup.api``. ``python -m measureup validate``
+lists the value list cells that could not be read. ``python -m measureup diff
+old.xlsx`` compares an earlier value list with the current one and, with
+``--estimates``, re-estimates only the rows whose Keys changed.
+"""
+
+import argparse
+import asyncio
+import itertools
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from measureup.bulk import RESULT_DTYPES, estimate_table
+from measureup.catalogue import DEFAULT_EXCEL_PATH, CatalogueError, load_catalogue
+from measureup.diff import CHANGE_DTYPES, UPDATED_DTYPES, diff_catalogues, recompute_estimates
+from measureup.export import EXPORT_FORMATS, EXTENSION_FORMATS, ExportWriter
+
+
+def read_chunks(path, chunksize):
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".xlsx", ".xls"):
+        # Excel cannot be streamed through pandas, so slice the parsed sheet instead
+        table = pd.read_excel(path)
+        for start in range(0, len(table), chunksize):
+            yield table.iloc[start:start + chunksize]
+    else:
+        yield from pd.read_csv(path, chunksize=chunksize)
+
+
+_worker_catalogue_path = None
+
+
+def _init_worker(catalogue_path):
+    global _worker_catalogue_path
+    _worker_catalogue_path = catalogue_path
+    load_catalogue(catalogue_path)
+
+
+def _estimate_chunk(chunk):
+    return estimate_table(load_catalogue(_worker_catalogue_path), chunk)
+
+
+def _estimate_chunks(chunks, catalogue_path, workers):
+    if workers <= 1:
+        catalogue = load_catalogue(catalogue_path)
+        for chunk in chunks:
+            yield estimate_table(catalogue, chunk)
+        return
+
+    # Keep only a couple of chunks per worker in flight so memory stays bounded
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(catalogue_path,)) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(_estimate_chunk, chunk))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _output_format(args):
+    fmt = args.format or EXTENSION_FORMATS.get(os.path.splitext(args.output)[1].lower())
+    if fmt is None:
+        raise SystemExit(f"Cannot infer output format from {args.output!r}, pass --format")
+    return fmt
+
+
+def _writer(fh, fmt, dtypes=None):
+    try:
+        return ExportWriter(fh, fmt, dtypes)
+    except RuntimeError as e:
+        raise SystemExit(str(e))
+
+
+def run_estimate(args):
+    fmt = _output_format(args)
+    started = time.perf_counter()
+    results = _estimate_chunks(read_chunks(args.input, args.chunksize), args.catalogue, args.workers)
+    # Estimate the first chunk before opening the output, so an unreadable input leaves it untouched
+    try:
+        first = next(results, None)
+    except FileNotFoundError as e:
+        raise SystemExit(f"{args.input}: {e.strerror}")
+    except ValueError as e:
+        raise SystemExit(f"{args.input}: {e}")
+    rows = failed = 0
+    with open(args.output, "wb") as fh:
+        with _writer(fh, fmt, RESULT_DTYPES) as writer:
+            for result in ([] if first is None else itertools.chain([first], results)):
+                writer.write(result)
+                rows += len(result)
+                failed += int((result["Status"] != "ok").sum())
+
+    elapsed = time.perf_counter() - started
+    print(f"Estimated {rows} rows ({failed} not estimated) in {elapsed:.2f}s -> {args.output}", file=sys.stderr)
+    return 0
+
+
+def run_validate(args):
+    try:
+        catalogue = load_catalogue(args.catalogue)
+    except CatalogueError as e:
+        print(f"{args.catalogue}: {e}", file=sys.stderr)
+        return 1
+    for issue in catalogue.issues:
+        print(f"{args.catalogue}: {issue}")
+    print(f"{len(catalogue.frame)} rows, {len(catalogue.issues)} issues", file=sys.stderr)
+    return 1 if catalogue.issues and args.strict else 0
+
+
+def run_diff(args):
+    try:
+        old, new = load_catalogue(args.previous), load_catalogue(args.catalogue)
+    except CatalogueError as e:
+        raise SystemExit(str(e))
+    diff = diff_catalogues(old, new)
+    for name, count in diff.summary().items():
+        print(f"{name}: {count}")
+    if args.changes:
+        with open(args.changes, "wb") as fh:
+            with _writer(fh, EXTENSION_FORMATS.get(os.path.splitext(args.changes)[1].lower(), "csv"), CHANGE_DTYPES) as writer:
+                writer.write(diff.changes)
+
+    if args.estimates:
+        if not args.output:
+            raise SystemExit("--estimates needs -o/--output")
+        fmt = _output_format(args)
+        rows = recomputed = 0
+        with open(args.output, "wb") as fh:
+            with _writer(fh, fmt, UPDATED_DTYPES) as writer:
+                for chunk in read_chunks(args.estimates, args.chunksize):
+                    try:
+                        result = recompute_estimates(chunk, new, diff)
+                    except ValueError as e:
+                        raise SystemExit(f"{args.estimates}: {e}")
+                    writer.write(result)
+                    rows += len(result)
+                    recomputed += int(result["Recomputed"].sum())
+        print(f"Recomputed {recomputed} of {rows} estimates -> {args.output}", file=sys.stderr)
+    return 0
+
+
+def run_serve(args):
+    from measureup.api import serve
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.catalogue))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m measureup", description="MeasureUp value estimation tools")
+    parser.add_argument("--catalogue", default=DEFAULT_EXCEL_PATH, help="value list workbook (default: bundled value_list.xlsx)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    estimate = commands.add_parser("estimate", help="estimate every activity in a CSV/XLSX file")
+    estimate.add_argument("input", help="CSV or XLSX table of activities, see the Bulk Estimate page for columns")
+    estimate.add_argument("-o", "--output", required=True, help="output file (.csv, .xlsx, .ndjson/.jsonl or .parquet)")
+    estimate.add_argument("--format", choices=sorted(EXPORT_FORMATS), help="output format if not implied by the extension")
+    estimate.add_argument("--chunksize", type=int, default=100_000, help="rows per chunk (default: 100000)")
+    estimate.add_argument("--workers", type=int, default=1, help="worker processes (default: 1)")
+    estimate.set_defaults(func=run_estimate)
+
+    validate = commands.add_parser("validate", help="check the value list and report cells that could not be read")
+    validate.add_argument("--strict", action="store_true", help="exit with status 1 if any issues are found")
+    validate.set_defaults(func=run_validate)
+
+    diff = commands.add_parser("diff", help="compare an earlier value list with --catalogue and update estimates")
+    diff.add_argument("previous", help="the earlier value list workbook")
+    diff.add_argument("--changes", help="write the changed cells here (.csv, .xlsx, .ndjson/.jsonl or .parquet)")
+    diff.add_argument("--estimates", help="CSV or XLSX of estimates made with the earlier value list")
+    diff.add_argument("-o", "--output", help="updated estimates file, required with --estimates")
+    diff.add_argument("--format", choices=sorted(EXPORT_FORMATS), help="output format if not implied by the extension")
+    diff.add_argument("--chunksize", type=int, default=100_000, help="rows per chunk (default: 100000)")
+    diff.set_defaults(func=run_diff)
+
+    serve = commands.add_parser("serve", help="run the HTTP/JSON estimation API")
+    serve.add_argument("--host", default="127.0.0.1", help="interface to bind (default: 127.0.0.1)")
+    serve.add_argument("--port", type=int, default=8000, help="port to listen on (default: 8000)")
+    serve.set_defaults(func=run_serve)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
@@ -0,0 +1,173 @@
+"""Comparison of two value list versions and recomputation of affected estimates.
+
+Rows are matched on (Key, Level, Silver name), with the Value name standing
+in for rows that have no Key, using a pandas hash join. The diff lists
+added and removed rows and every changed value cell. ``recompute_estimates``
+then re-runs only those rows of a previously estimated table whose Key was
+touched by the update. The estimates may also be a page 6 report (the
+two-column Item/Value download), which is read as a single activity.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from measureup.bulk import RESULT_DTYPES, _text, estimate_table, input_renames, normalise_inputs
+from measureup.catalogue import NUMERIC_COLUMNS
+from measureup.engine import find_column
+from measureup.report import REPORT_COLUMNS
+
+# Columns whose changes alter estimates
+COMPARED_COLUMNS = NUMERIC_COLUMNS + ["Unit 2"]
+ROW_ID = ["Match key", "Level", "Silver name"]
+CHANGE_COLUMNS = ROW_ID + ["Value name", "Column", "Old", "New"]
+# Old and New mix numbers with Unit 2 labels, so typed exports write them as text
+CHANGE_DTYPES = {name: "string" for name in CHANGE_COLUMNS}
+# Column types of a recompute_estimates result
+UPDATED_DTYPES = {**RESULT_DTYPES, "Recomputed": "bool"}
+# Relative tolerance for value changes; re-saving a workbook can move the last digit
+RELATIVE_TOLERANCE = 1e-9
+
+
+def _row_ids(frame):
+    """Identity columns plus the compared columns, one row per identity (first wins)."""
+    keys = _text(frame, "Key")
+    ids = pd.DataFrame({
+        "Match key": keys.fillna(_text(frame, "Value name")),
+        "Level": _text(frame, "Level").str.lower(),
+        "Silver name": _text(frame, "Silver name").fillna(""),
+        "Value name": frame["Value name"].to_numpy(),
+    })
+    for column in COMPARED_COLUMNS:
+        ids[column] = frame[column].to_numpy() if column in frame.columns else np.nan
+    return ids[~ids.duplicated(ROW_ID).to_numpy()]
+
+
+def _differs(old, new, numeric):
+    old_missing, new_missing = pd.isna(old), pd.isna(new)
+    both = ~old_missing & ~new_missing
+    if numeric:
+        equal = np.isclose(old.astype(float), new.astype(float), rtol=RELATIVE_TOLERANCE, atol=0)
+    else:
+        equal = old.astype(str) == new.astype(str)
+    return ~((old_missing & new_missing) | (both & equal))
+
+
+@dataclass(frozen=True)
+class CatalogueDiff:
+    old_version: str
+    new_version: str
+    added: pd.DataFrame
+    removed: pd.DataFrame
+    # One row per changed cell, see CHANGE_COLUMNS
+    changes: pd.DataFrame
+
+    @property
+    def changed_keys(self):
+        """Match keys (Key, or Value name without one) touched by the update."""
+        return set(self.added["Match key"]) | set(self.removed["Match key"]) | set(self.changes["Match key"])
+
+    def summary(self):
+        """Changed cell counts per column plus added and removed row counts."""
+        counts = self.changes["Column"].value_counts().reindex(COMPARED_COLUMNS, fill_value=0)
+        counts["Rows added"] = len(self.added)
+        counts["Rows removed"] = len(self.removed)
+        return counts.rename("Count")
+
+
+def diff_catalogues(old, new):
+    """Compare two ``Catalogue`` versions row by row."""
+    old_ids, new_ids = _row_ids(old.frame), _row_ids(new.frame)
+    merged = old_ids.merge(new_ids, on=ROW_ID, how="outer", suffixes=(" (old)", " (new)"), indicator=True)
+    both = merged[merged["_merge"] == "both"]
+
+    changes = []
+    for column in COMPARED_COLUMNS:
+        old_values, new_values = both[f"{column} (old)"], both[f"{column} (new)"]
+        changed = _differs(old_values.to_numpy(dtype=object), new_values.to_numpy(dtype=object), column in NUMERIC_COLUMNS)
+        if changed.any():
+            rows = both[changed]
+            changes.append(pd.DataFrame({
+                "Match key": rows["Match key"],
+                "Level": rows["Level"],
+                "Silver name": rows["Silver name"],
+                "Value name": rows["Value name (new)"],
+                "Column": column,
+                "Old": old_values[changed],
+                "New": new_values[changed],
+            }))
+    changes = pd.concat(changes, ignore_index=True) if changes else pd.DataFrame(columns=CHANGE_COLUMNS)
+
+    def side(indicator, suffix):
+        rows = merged[merged["_merge"] == indicator]
+        return rows[ROW_ID + [f"Value name {suffix}"]].rename(columns={f"Value name {suffix}": "Value name"}).reset_index(drop=True)
+
+    return CatalogueDiff(
+        old_version=old.version,
+        new_version=new.version,
+        added=side("right_only", "(new)"),
+        removed=side("left_only", "(old)"),
+        changes=changes[CHANGE_COLUMNS],
+    )
+
+
+def report_estimates(report):
+    """A page 6 Item/Value report as a one-row estimates table.
+
+    The Unit items carry their unit in the label, e.g. "Unit 1 (No. of
+    people)", and the Level is Silver when the report names a Silver Level.
+    Other items become columns as they are.
+    """
+    items = {}
+    for label, value in zip(report["Item"].astype(str), report["Value"]):
+        for unit in ("Unit 1", "Unit 2"):
+            if label.startswith(f"{unit} ("):
+                label = unit
+        items[label] = value
+    items["Level"] = "Silver" if not pd.isna(items.get("Silver Level", np.nan)) else "Bronze"
+    return pd.DataFrame([items])
+
+
+def is_report(table):
+    return [str(col) for col in table.columns] == REPORT_COLUMNS
+
+
+def affected_rows(estimates, diff: CatalogueDiff):
+    """Boolean mask of the estimate rows whose Key (or Value name) the update touched."""
+    table = normalise_inputs(estimates)
+    keys = _text(table, "Key").fillna(_text(table, "Value name"))
+    changed = keys.isin(diff.changed_keys)
+    # Rows matched by Value name carry the catalogue Key they were estimated with
+    if "Matched Key" in table.columns:
+        changed |= _text(table, "Matched Key").isin(diff.changed_keys)
+    return changed.fillna(False).to_numpy(dtype=bool)
+
+
+def recompute_estimates(estimates, new, diff: CatalogueDiff):
+    """Re-estimate against ``new`` only the rows affected by ``diff``.
+
+    ``estimates`` is a table as produced by the Bulk Estimate page, the CLI
+    or the portfolio download, or a page 6 report. Returns it with the affected rows' results
+    replaced and a "Recomputed" column; other rows are left as they were,
+    since their catalogue rows did not change. Inputs keep the headers they
+    were read with, e.g. "Selected Value Name" rather than "Value name".
+    """
+    if is_report(estimates):
+        estimates = report_estimates(estimates)
+    mask = affected_rows(estimates, diff)
+    updated = estimates.copy()
+    if mask.any():
+        original = {name: col for col, name in input_renames(estimates.columns).items()}
+        redone = estimate_table(new, estimates[mask]).rename(columns=original)
+        for column in redone.columns:
+            # Rebuild whole columns; a column read as all-NaN floats cannot take text in place
+            values = updated[column].to_numpy(dtype=object, copy=True) if column in updated.columns else np.full(len(updated), None, dtype=object)
+            values[mask] = redone[column].to_numpy(dtype=object)
+            updated[column] = pd.Series(values, index=updated.index).infer_objects()
+    # "Catalogue version" in tables, "Catalogue Version" in page 6 reports
+    version_column = find_column(updated.columns, "catalogue version")
+    if version_column is not None:
+        updated[version_column] = new.version
+    updated["Recomputed"] = mask
+    return updated
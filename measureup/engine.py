@@ -0,0 +1,146 @@
+"""Monetisation formulas behind Step 4 of the wizard.
+
+Kept free of Streamlit so estimates can run in batch jobs, tests or an API.
+"""
+
+from dataclasses import dataclass
+from typing import Mapping, Optional
+
+import pandas as pd
+
+IMPACT_DISCOUNT_MAPPING = {"No discount": 0, "Low": 0.25, "Medium": 0.5, "High": 0.75}
+IMPACT_LEVELS = list(IMPACT_DISCOUNT_MAPPING)
+
+VALUE_TYPE_COLUMN_MAPPING = {"Economic": "Economic", "Fiscal": "Fiscal", "Wellbeing": "Social", "Environmental": "Environmental"}
+VALUE_TYPES = list(VALUE_TYPE_COLUMN_MAPPING)
+
+# Per-level base value column, as named in the loaded catalogue
+LEVEL_VALUE_COLUMNS = {"Bronze": "Bronze Value", "Silver": "Silver values"}
+LEVELS = list(LEVEL_VALUE_COLUMNS)
+
+# Unit 2 labels that measure time, as years per unit (matched lower-cased with single spaces).
+# Other Unit 2s, such as km or nights, are quantities and the activity counts as one year.
+UNIT2_YEARS = {"no. of year": 1.0, "no. of week": 1 / 52}
+
+
+@dataclass(frozen=True)
+class EstimateInputs:
+    level: str = "Bronze"
+    unit1: float = 0
+    unit2: float = 1
+    impact_level: str = "Low"
+    value_type: str = "Economic"
+
+
+@dataclass(frozen=True)
+class EstimateResult:
+    base_value_per_unit: float
+    impact_discount_percentage: float
+    monetised_value_per_unit: float
+    total_monetised_value: float
+    base_value_type: float
+    total_value_by_type: float
+    kg_co2_per_unit: Optional[float]
+    kg_co2_value: float
+    wellby_per_unit: Optional[float]
+    wellby_value: float
+    # False when the catalogue row has no Unit 2, in which case Unit 2 counts as 1
+    has_unit2: bool
+    # False when the row has no column for the selected value type
+    has_value_type_column: bool
+
+
+def is_missing(value):
+    return value is None or (pd.api.types.is_scalar(value) and pd.isna(value))
+
+
+def unit2_years(label):
+    """Years per Unit 2 for a catalogue Unit 2 label, or None when it is not a duration."""
+    if is_missing(label):
+        return None
+    return UNIT2_YEARS.get(" ".join(str(label).lower().split()))
+
+
+def duration_years(label, unit2):
+    """Years an activity runs for: Unit 2 when its label is a duration, otherwise one year."""
+    years = unit2_years(label)
+    return 1.0 if years is None else unit2 * years
+
+
+def to_number(value, default=0.0):
+    """Catalogue cell as a float; blanks and non-numeric text become ``default``."""
+    if is_missing(value):
+        return default
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _value(row, column):
+    # Value columns are float64 once the catalogue is loaded; NaN counts as 0
+    value = row.get(column)
+    return 0.0 if value is None or value != value else value
+
+
+def find_column(columns, name):
+    """First header matching ``name`` after stripping and lower-casing, or None."""
+    for col in columns:
+        if isinstance(col, str) and col.strip().lower() == name:
+            return col
+    return None
+
+
+def impact_discount(impact_level):
+    return IMPACT_DISCOUNT_MAPPING.get(impact_level, 0)
+
+
+def estimate(row: Mapping, inputs: EstimateInputs) -> EstimateResult:
+    """Apply the Step 4 formulas to one catalogue row.
+
+    ``row`` is any mapping of catalogue column to cell value, e.g. a
+    ``CatalogueRow`` or a pandas Series taken from the loaded catalogue frame,
+    whose value columns are already numeric.
+    """
+    discount = impact_discount(inputs.impact_level)
+    factor = 1 - discount
+    has_unit2 = not is_missing(row.get("Unit 2"))
+    unit2 = inputs.unit2 if has_unit2 else 1
+
+    base_value_per_unit = _value(row, LEVEL_VALUE_COLUMNS.get(inputs.level))
+    monetised_value_per_unit = base_value_per_unit * factor
+    total_monetised_value = monetised_value_per_unit * inputs.unit1 * unit2
+
+    type_column = VALUE_TYPE_COLUMN_MAPPING.get(inputs.value_type)
+    has_value_type_column = type_column is not None and type_column in row
+    base_value_type = _value(row, type_column) if has_value_type_column else 0
+    total_value_by_type = base_value_type * inputs.unit1 * unit2 * factor
+
+    kg_co2_per_unit = None
+    kg_co2_value = 0
+    kg_co2 = row.get("kg CO2e")
+    if inputs.value_type == "Environmental" and kg_co2 is not None and kg_co2 == kg_co2:
+        kg_co2_per_unit = kg_co2
+        kg_co2_value = kg_co2_per_unit * inputs.unit1 * unit2 * factor
+
+    wellby_per_unit = None
+    wellby_value = 0
+    wellby = _value(row, "WELLBY")
+    if inputs.value_type == "Wellbeing" and wellby != 0:
+        wellby_per_unit = wellby
+        wellby_value = wellby_per_unit * inputs.unit1 * unit2 * factor
+
+    return EstimateResult(
+        base_value_per_unit=base_value_per_unit,
+        impact_discount_percentage=discount,
+        monetised_value_per_unit=monetised_value_per_unit,
+        total_monetised_value=total_monetised_value,
+        base_value_type=base_value_type,
+        total_value_by_type=total_value_by_type,
+        kg_co2_per_unit=kg_co2_per_unit,
+        kg_co2_value=kg_co2_value,
+        wellby_per_unit=wellby_per_unit,
+        wellby_value=wellby_value,
+        has_unit2=has_unit2,
+        has_value_type_column=has_value_type_column,
+    )
@@ -0,0 +1,169 @@
+"""Chunked export of result tables to CSV, XLSX, Parquet and NDJSON.
+
+Results are written one chunk at a time to a binary file handle, so the
+memory used does not grow with the number of rows: CSV and NDJSON are
+encoded chunk by chunk, XLSX uses openpyxl's write-only mode (rows are
+streamed to a temporary file until the workbook is saved) and Parquet
+writes one row group per chunk. Parquet columns are typed from ``dtypes``
+where given; any other column is written as text, since a later chunk may
+hold values its first chunk did not. ``export_spooled`` collects the output in a
+SpooledTemporaryFile, which only spills to disk once it gets large.
+"""
+
+import tempfile
+
+import pandas as pd
+
+# format -> (file extension, MIME type)
+EXPORT_FORMATS = {
+    "csv": (".csv", "text/csv"),
+    "xlsx": (".xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "parquet": (".parquet", "application/vnd.apache.parquet"),
+    "ndjson": (".ndjson", "application/x-ndjson"),
+}
+EXTENSION_FORMATS = {".csv": "csv", ".xlsx": "xlsx", ".parquet": "parquet", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+
+DEFAULT_CHUNKSIZE = 50_000
+# Spill the spooled export to disk beyond this many bytes
+SPOOL_MAX_MEMORY = 8 * 1024 * 1024
+# Rows per sheet Excel can hold, header included
+XLSX_MAX_ROWS = 1_048_576
+
+
+def iter_chunks(table, chunksize=DEFAULT_CHUNKSIZE):
+    """Yield ``table`` in slices if it is a DataFrame, or pass an iterable of chunks through."""
+    if isinstance(table, pd.DataFrame):
+        for start in range(0, max(len(table), 1), chunksize):
+            yield table.iloc[start:start + chunksize]
+    else:
+        yield from table
+
+
+def _typed(chunk, dtypes):
+    """``chunk`` with the columns named in ``dtypes`` converted to "string", "float64", "int64" or "bool"."""
+    converted = {}
+    for col, dtype in dtypes.items():
+        if col in chunk.columns:
+            if dtype == "float64":
+                converted[col] = pd.to_numeric(chunk[col], errors="coerce").astype("float64")
+            else:
+                converted[col] = chunk[col].astype(dtype)
+    return chunk.assign(**converted) if converted else chunk
+
+
+def _xlsx_rows(chunk):
+    # openpyxl cannot write NaN or numpy scalars; object columns hold plain Python values
+    values = chunk.astype(object).where(chunk.notna(), None)
+    return values.to_numpy().tolist()
+
+
+class ExportWriter:
+    """Appends DataFrame chunks to ``fh`` (a binary file object) in ``fmt``.
+
+    ``dtypes`` maps column names to "string", "float64", "int64" or "bool" for
+    typed formats (Parquet), e.g. ``measureup.bulk.RESULT_DTYPES``.
+    """
+
+    def __init__(self, fh, fmt, dtypes=None):
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format {fmt!r}, expected one of {sorted(EXPORT_FORMATS)}")
+        self.fh = fh
+        self.fmt = fmt
+        self.dtypes = dict(dtypes or {})
+        self.rows = 0
+        self._parquet = None
+        self._workbook = None
+        self._sheet = None
+        self._sheet_rows = 0
+        self._columns = None
+        if fmt == "parquet":
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)")
+        elif fmt == "xlsx":
+            from openpyxl import Workbook
+
+            self._workbook = Workbook(write_only=True)
+
+    def write(self, chunk):
+        first = self._columns is None
+        if first:
+            self._columns = [str(col) for col in chunk.columns]
+        if self.fmt == "csv":
+            self.fh.write(chunk.to_csv(index=False, header=first, lineterminator="\n").encode("utf-8"))
+        elif self.fmt == "ndjson":
+            if len(chunk):
+                self.fh.write(chunk.to_json(orient="records", lines=True, force_ascii=False).encode("utf-8"))
+        elif self.fmt == "parquet":
+            self._write_parquet(chunk)
+        else:
+            self._write_xlsx(chunk)
+        self.rows += len(chunk)
+
+    def _write_parquet(self, chunk):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if self._parquet is None:
+            # Columns without a listed type would be typed from the first chunk alone, e.g. a Ref
+            # column read as integers that later holds "A-7", so write them as text
+            for col in chunk.columns:
+                self.dtypes.setdefault(col, "string")
+        batch = pa.Table.from_pandas(_typed(chunk, self.dtypes), preserve_index=False)
+        if self._parquet is None:
+            self._parquet = pq.ParquetWriter(self.fh, batch.schema)
+        self._parquet.write_table(batch.cast(self._parquet.schema))
+
+    def _write_xlsx(self, chunk):
+        for values in _xlsx_rows(chunk):
+            if self._sheet is None or self._sheet_rows >= XLSX_MAX_ROWS:
+                self._new_sheet()
+            self._sheet.append(values)
+            self._sheet_rows += 1
+
+    def _new_sheet(self):
+        number = len(self._workbook.worksheets) + 1
+        self._sheet = self._workbook.create_sheet("Results" if number == 1 else f"Results {number}")
+        self._sheet.append(self._columns)
+        self._sheet_rows = 1
+
+    def close(self):
+        if self._parquet is not None:
+            self._parquet.close()
+        if self._workbook is not None:
+            if self._sheet is None and self._columns is not None:
+                self._new_sheet()
+            if not self._workbook.worksheets:
+                self._workbook.create_sheet("Results")
+            self._workbook.save(self.fh)
+            self._workbook = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_export(table, fh, fmt, chunksize=DEFAULT_CHUNKSIZE, dtypes=None):
+    """Write ``table`` (a DataFrame or an iterable of chunks) to ``fh``; returns the row count."""
+    with ExportWriter(fh, fmt, dtypes) as writer:
+        for chunk in iter_chunks(table, chunksize):
+            writer.write(chunk)
+    return writer.rows
+
+
+def export_spooled(table, fmt, chunksize=DEFAULT_CHUNKSIZE, max_memory=SPOOL_MAX_MEMORY, dtypes=None):
+    """Export to a SpooledTemporaryFile rewound to the start, ready to be read or sent."""
+    spool = tempfile.SpooledTemporaryFile(max_size=max_memory, mode="w+b")
+    write_export(table, spool, fmt, chunksize, dtypes)
+    spool.seek(0)
+    return spool
+
+
+def export_stream(table, fmt, chunksize=DEFAULT_CHUNKSIZE, block_size=1 << 16, dtypes=None):
+    """Yield the exported bytes in blocks, e.g. for a streaming HTTP response."""
+    with export_spooled(table, fmt, chunksize, dtypes=dtypes) as spool:
+        for block in iter(lambda: spool.read(block_size), b""):
+            yield block
@@ -0,0 +1,143 @@
+"""Process-wide memo of estimates and their page 6 reports.
+
+Many sessions estimate the same common values with the same units and
+discount level. The result and the serialized report of each distinct
+(catalogue version, Key, selection, Unit 1, Unit 2, impact level, value
+type) are kept in a bounded LRU shared by every session in the process. The
+free text notes differ per session, so they are left blank in the cached
+report and filled in on each lookup. ``MEASUREUP_MEMO_SIZE`` sets the number
+of entries kept; ``stats()`` reports hits, misses and evictions for tuning it.
+"""
+
+import io
+import os
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from measureup.engine import EstimateInputs, EstimateResult, estimate, is_missing
+from measureup.report import ReportNotes, report_csv, report_frame, report_items
+
+DEFAULT_MEMO_SIZE = int(os.environ.get("MEASUREUP_MEMO_SIZE") or 4096)
+# Report item label -> ReportNotes field
+NOTE_ITEMS = {
+    "Stakeholders": "stakeholders",
+    "Activity": "activity",
+    "Outcomes": "outcomes",
+    "Indicator and Source": "indicator_source",
+    "Impact Evidence": "impact_evidence",
+}
+# Stands in for a note in the serialized template; csv never quotes it
+_PLACEHOLDER = "\x00{}\x00"
+_PLACEHOLDER_RE = re.compile("\x00(" + "|".join(NOTE_ITEMS.values()) + ")\x00")
+
+
+def _csv_field(text):
+    # Same minimal quoting as DataFrame.to_csv
+    if any(char in text for char in ',"\r\n'):
+        return '"' + text.replace('"', '""') + '"'
+    return text
+
+
+def _template(items):
+    """The report CSV split into encoded chunks and the ReportNotes fields between them."""
+    filled = {label: (_PLACEHOLDER.format(NOTE_ITEMS[label]) if label in NOTE_ITEMS else value) for label, value in items}
+    text = report_csv(report_frame(filled))
+    # Odd chunks are the field names captured from the placeholders
+    return tuple(chunk if i % 2 else chunk.encode("utf-8") for i, chunk in enumerate(_PLACEHOLDER_RE.split(text)))
+
+
+@dataclass(frozen=True)
+class MemoEntry:
+    result: EstimateResult
+    # (label, value) report lines with blank notes
+    items: tuple
+    template: tuple
+
+    def report_items(self, notes: ReportNotes):
+        """The report lines with this session's notes filled in."""
+        return {label: (getattr(notes, NOTE_ITEMS[label]) if label in NOTE_ITEMS else value) for label, value in self.items}
+
+    def report_bytes(self, notes: ReportNotes):
+        """The report CSV, as ``report_csv`` would write it, as UTF-8 bytes."""
+        buffer = io.BytesIO()
+        for part in self.template:
+            buffer.write(part if isinstance(part, bytes) else _csv_field(str(getattr(notes, part))).encode("utf-8"))
+        return buffer.getvalue()
+
+
+class EstimateMemo:
+    """Bounded LRU of ``MemoEntry`` objects, safe to share between sessions."""
+
+    def __init__(self, maxsize=DEFAULT_MEMO_SIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(catalogue, row, selection, inputs: EstimateInputs):
+        value_name, level, silver_name = selection
+        # Keys are blank for some rows, so the value name is part of the key too
+        row_key = row.get("Key")
+        return (
+            catalogue.version,
+            None if is_missing(row_key) else row_key,
+            value_name,
+            level,
+            silver_name if level == "Silver" else None,
+            inputs.unit1,
+            inputs.unit2,
+            inputs.impact_level,
+            inputs.value_type,
+        )
+
+    def get(self, catalogue, selection, inputs: EstimateInputs):
+        """The entry for ``selection`` estimated with ``inputs``, or None if it is not in the catalogue."""
+        row = catalogue.row(selection)
+        if row is None:
+            return None
+        key = self.key(catalogue, row, selection, inputs)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        # Computed outside the lock; two sessions missing at once just compute it twice
+        result = estimate(row, inputs)
+        value_name, level, silver_name = selection
+        items = report_items(row, value_name, silver_name, inputs, result, ReportNotes(), catalogue_version=catalogue.version)
+        items = tuple(items.items())
+        entry = MemoEntry(result=result, items=items, template=_template(items))
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+memo = EstimateMemo()
@@ -0,0 +1,107 @@
+"""A session's collection of completed estimates.
+
+Items are kept column-wise (an ``array`` per numeric column, a list per text
+column) rather than as one dict or DataFrame per item, and the totals by
+value type, stakeholder and Value name are updated as each item is added so
+page 6 never has to re-aggregate the whole portfolio. Projections are made
+from the stored totals, so they match the figures each item was added with.
+"""
+
+from array import array
+
+import pandas as pd
+
+from measureup.engine import is_missing, to_number
+from measureup.projection import ProjectionSettings, project_totals
+
+TEXT_COLUMNS = ["Stakeholders", "Activity", "Value name", "Key", "Level", "Silver name", "Impact level", "Type of monetised value", "Catalogue version"]
+NUMBER_COLUMNS = [
+    "Unit 1",
+    "Unit 2",
+    "Base Value Per Unit (£)",
+    "Total Monetised Value (£)",
+    "Total Monetised Value By Type (£)",
+    "Total kg CO2",
+    "Total WELLBYs",
+]
+COLUMNS = TEXT_COLUMNS + NUMBER_COLUMNS
+# Column types of to_frame, for typed exports such as Parquet
+PORTFOLIO_DTYPES = {**{name: "string" for name in TEXT_COLUMNS}, **{name: "float64" for name in NUMBER_COLUMNS}}
+
+GROUPINGS = {"value_type": "Type of monetised value", "stakeholder": "Stakeholders", "value_name": "Value name"}
+TOTAL_COLUMNS = ["Activities", "Total Monetised Value (£)", "Total Monetised Value By Type (£)", "Total kg CO2", "Total WELLBYs"]
+
+
+class Totals:
+    __slots__ = ("count", "monetised", "by_type", "kg_co2", "wellbys")
+
+    def __init__(self):
+        self.count = 0
+        self.monetised = 0.0
+        self.by_type = 0.0
+        self.kg_co2 = 0.0
+        self.wellbys = 0.0
+
+    def add(self, monetised, by_type, kg_co2, wellbys):
+        self.count += 1
+        self.monetised += monetised
+        self.by_type += by_type
+        self.kg_co2 += kg_co2
+        self.wellbys += wellbys
+
+    def as_row(self):
+        return [self.count, self.monetised, self.by_type, self.kg_co2, self.wellbys]
+
+
+class Portfolio:
+    def __init__(self):
+        self._text = {name: [] for name in TEXT_COLUMNS}
+        self._numbers = {name: array("d") for name in NUMBER_COLUMNS}
+        # Years each item's value is spread over when projected, see measureup.engine.duration_years
+        self._durations = array("d")
+        self.total = Totals()
+        self._groups = {grouping: {} for grouping in GROUPINGS}
+
+    def __len__(self):
+        return self.total.count
+
+    def add(self, item):
+        """Append one estimate given as a mapping of ``COLUMNS`` to values."""
+        for name in TEXT_COLUMNS:
+            value = item.get(name)
+            self._text[name].append("" if is_missing(value) else str(value))
+        for name in NUMBER_COLUMNS:
+            self._numbers[name].append(to_number(item.get(name)))
+        self._durations.append(to_number(item.get("Duration (years)"), default=1.0))
+
+        amounts = (
+            self._numbers["Total Monetised Value (£)"][-1],
+            self._numbers["Total Monetised Value By Type (£)"][-1],
+            self._numbers["Total kg CO2"][-1],
+            self._numbers["Total WELLBYs"][-1],
+        )
+        self.total.add(*amounts)
+        for grouping, column in GROUPINGS.items():
+            label = self._text[column][-1] or "(not given)"
+            self._groups[grouping].setdefault(label, Totals()).add(*amounts)
+
+    def clear(self):
+        self.__init__()
+
+    def to_frame(self):
+        data = {name: self._text[name] for name in TEXT_COLUMNS}
+        data.update({name: self._numbers[name] for name in NUMBER_COLUMNS})
+        return pd.DataFrame(data, columns=COLUMNS)
+
+    def project(self, settings: ProjectionSettings = ProjectionSettings()):
+        """Multi-year projection of the items' Total Monetised Value."""
+        return project_totals(self._numbers["Total Monetised Value (£)"], self._durations, settings)
+
+    def totals(self, grouping):
+        """Aggregated totals for ``grouping`` (one of ``GROUPINGS``) as a DataFrame."""
+        groups = self._groups[grouping]
+        return pd.DataFrame(
+            [totals.as_row() for totals in groups.values()],
+            index=pd.Index(list(groups), name=GROUPINGS[grouping]),
+            columns=TOTAL_COLUMNS,
+        )
@@ -0,0 +1,172 @@
+"""Optional per-rerun timing instrumentation.
+
+Enabled by setting ``MEASUREUP_PROFILE=1``. Each Streamlit rerun records how
+long its stages took (catalogue load, filtering, HTML building, report
+creation, ...) under the page it ran for. Timings are aggregated per process
+so the app can show them in a debug panel, and if ``MEASUREUP_PROFILE_FILE``
+is set they are also written there: one JSON line per rerun, or, when the
+file name ends in ``.prom`` (or ``MEASUREUP_PROFILE_FORMAT=prometheus``), the
+aggregated counters in Prometheus text format, rewritten after every rerun.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+PROFILE_ENABLED = os.environ.get("MEASUREUP_PROFILE", "").strip().lower() in ("1", "true", "yes", "on")
+PROFILE_FILE = os.environ.get("MEASUREUP_PROFILE_FILE", "")
+PROFILE_FORMAT = os.environ.get("MEASUREUP_PROFILE_FORMAT") or ("prometheus" if PROFILE_FILE.endswith(".prom") else "jsonl")
+
+# Stage name under which the whole rerun is recorded
+TOTAL_STAGE = "total"
+
+
+class StageStats:
+    __slots__ = ("count", "total", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+
+class ProfileRegistry:
+    """Process-wide aggregate of every recorded rerun."""
+
+    def __init__(self, path="", fmt="jsonl"):
+        self.path = path
+        self.fmt = fmt
+        self._lock = threading.RLock()
+        # (page, stage) -> StageStats
+        self.stages = {}
+        # session id -> number of reruns
+        self.reruns = {}
+
+    def record(self, session_id, page, stages):
+        with self._lock:
+            self.reruns[session_id] = self.reruns.get(session_id, 0) + 1
+            for stage, seconds in stages.items():
+                self.stages.setdefault((page, stage), StageStats()).add(seconds)
+            rerun_count = self.reruns[session_id]
+            if self.path:
+                self._write(session_id, page, rerun_count, stages)
+
+    def summary(self):
+        """Rows of (page, stage, count, total ms, mean ms, max ms), slowest total first."""
+        with self._lock:
+            rows = [
+                (page, stage, stats.count, stats.total * 1000, stats.total * 1000 / stats.count, stats.max * 1000)
+                for (page, stage), stats in self.stages.items()
+            ]
+        return sorted(rows, key=lambda row: -row[3])
+
+    def session_reruns(self, session_id):
+        with self._lock:
+            return self.reruns.get(session_id, 0)
+
+    def to_prometheus(self):
+        metrics = [
+            ("measureup_stage_seconds_total", "counter", "Time spent per page and stage.", lambda stats: f"{stats.total:.6f}"),
+            ("measureup_stage_calls_total", "counter", "Times each page and stage ran.", lambda stats: str(stats.count)),
+            ("measureup_stage_seconds_max", "gauge", "Slowest single run per page and stage.", lambda stats: f"{stats.max:.6f}"),
+        ]
+        with self._lock:
+            stages = sorted(self.stages.items(), key=lambda item: (str(item[0][0]), item[0][1]))
+            reruns = sum(self.reruns.values())
+            sessions = len(self.reruns)
+        lines = []
+        for name, kind, help_text, value in metrics:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+            lines += [f'{name}{{page="{page}",stage="{stage}"}} {value(stats)}' for (page, stage), stats in stages]
+        lines += [
+            "# HELP measureup_reruns_total Script reruns across all sessions.",
+            "# TYPE measureup_reruns_total counter",
+            f"measureup_reruns_total {reruns}",
+            "# HELP measureup_sessions Sessions seen by this process.",
+            "# TYPE measureup_sessions gauge",
+            f"measureup_sessions {sessions}",
+        ]
+        return "\n".join(lines) + "\n"
+
+    def _write(self, session_id, page, rerun_count, stages):
+        try:
+            if self.fmt == "prometheus":
+                # Rewrite atomically so scrapers never read a half-written file
+                directory = os.path.dirname(os.path.abspath(self.path))
+                fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+                with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                    fh.write(self.to_prometheus())
+                os.replace(tmp_path, self.path)
+            else:
+                line = {
+                    "ts": time.time(),
+                    "session": session_id,
+                    "page": page,
+                    "rerun": rerun_count,
+                    "stages_ms": {stage: round(seconds * 1000, 3) for stage, seconds in stages.items()},
+                }
+                with open(self.path, "a", encoding="utf-8") as fh:
+                    fh.write(json.dumps(line) + "\n")
+        except OSError:
+            # Profiling must never break the app
+            pass
+
+
+registry = ProfileRegistry(PROFILE_FILE, PROFILE_FORMAT)
+
+
+class Rerun:
+    """Timings of one script run; ``finish`` hands them to the registry."""
+
+    def __init__(self, session_id, page, registry=registry):
+        self.session_id = session_id
+        self.page = page
+        self.registry = registry
+        self.stages = {}
+        self._started = time.perf_counter()
+        self._finished = False
+
+    @contextmanager
+    def stage(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - started
+
+    @property
+    def finished(self):
+        return self._finished
+
+    def finish(self):
+        # Called before st.rerun()/st.stop() as well as at the end of the script, so only count once
+        if self._finished:
+            return
+        self._finished = True
+        self.stages[TOTAL_STAGE] = time.perf_counter() - self._started
+        self.registry.record(self.session_id, self.page, self.stages)
+
+
+class NullRerun:
+    """Stand-in used when profiling is disabled, so call sites need no checks."""
+
+    stages = {}
+    finished = False
+
+    def stage(self, name):
+        return nullcontext()
+
+    def finish(self):
+        pass
+
+
+def start_rerun(session_id, page):
+    return Rerun(session_id, page) if PROFILE_ENABLED else NullRerun()
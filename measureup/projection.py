@@ -0,0 +1,116 @@
+"""Multi-year present value projections of estimated activities.
+
+The wizard multiplies by Unit 2 as a flat number. Where Unit 2 is a
+duration (years or weeks) each activity's annual value is spread over it
+instead (a final part year counts pro rata); any other activity counts as
+one year. Values are reduced by a yearly drop-off, uplifted by inflation
+and discounted to present value. The first year is year 0 and is not
+discounted, as in the HM Treasury Green Book. All activities and years are
+computed as one (activities × years) array, at most ``MAX_YEARS`` wide.
+"""
+
+import math
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+GREEN_BOOK_DISCOUNT_RATE = 0.035
+# Green Book long-term schedule: (first year the rate applies, rate)
+GREEN_BOOK_SCHEDULE = ((0, 0.035), (31, 0.03), (76, 0.025), (126, 0.02), (201, 0.015), (301, 0.01))
+# Longest projection; later years of longer activities are left out
+MAX_YEARS = 100
+PROJECTION_COLUMNS = ["Year", "Value (£)", "Discount Factor", "Present Value (£)", "Cumulative Present Value (£)"]
+# Column types of Projection.yearly_frame, for typed exports such as Parquet
+PROJECTION_DTYPES = {"Year": "int64", **{name: "float64" for name in PROJECTION_COLUMNS[1:]}}
+
+
+@dataclass(frozen=True)
+class ProjectionSettings:
+    discount_rate: float = GREEN_BOOK_DISCOUNT_RATE
+    # Use the declining Green Book schedule instead of a flat discount_rate
+    declining: bool = False
+    # Share of the previous year's outcome lost each year
+    drop_off: float = 0.0
+    # Annual uplift applied to £ values
+    inflation: float = 0.0
+    # Years to project; None projects to the end of the longest activity (both capped at MAX_YEARS)
+    horizon: Optional[int] = None
+
+
+def discount_factors(years, settings: ProjectionSettings):
+    """Present value of £1 in each year 0..years-1."""
+    t = np.arange(years)
+    if not settings.declining:
+        return (1 + settings.discount_rate) ** -t.astype(float)
+    starts = np.array([start for start, _ in GREEN_BOOK_SCHEDULE])
+    rates = np.array([rate for _, rate in GREEN_BOOK_SCHEDULE])
+    yearly = rates[np.searchsorted(starts, t, side="right") - 1]
+    # Year t is discounted at each year's own rate for years 1..t
+    return np.concatenate([[1.0], np.cumprod(1 / (1 + yearly[1:]))])[:years]
+
+
+@dataclass(frozen=True)
+class Projection:
+    """Per-activity, per-year values; rows follow the input order."""
+
+    years: np.ndarray
+    values: np.ndarray
+    present_values: np.ndarray
+    factors: np.ndarray
+
+    def yearly_frame(self):
+        """Totals per year across all activities."""
+        values = self.values.sum(axis=0)
+        present = self.present_values.sum(axis=0)
+        return pd.DataFrame({
+            "Year": self.years,
+            "Value (£)": values,
+            "Discount Factor": self.factors,
+            "Present Value (£)": present,
+            "Cumulative Present Value (£)": np.cumsum(present),
+        }, columns=PROJECTION_COLUMNS)
+
+    def activity_totals(self):
+        """(total value, total present value) per activity."""
+        return self.values.sum(axis=1), self.present_values.sum(axis=1)
+
+
+def project(annual_values, durations, settings: ProjectionSettings = ProjectionSettings()):
+    """Project ``annual_values`` (£ per year) over ``durations`` (years) for every activity."""
+    annual = np.nan_to_num(np.asarray(annual_values, dtype=float))
+    durations = np.clip(np.nan_to_num(np.asarray(durations, dtype=float)), 0, None)
+    years = settings.horizon
+    if years is None:
+        years = int(math.ceil(durations.max())) if durations.size else 0
+    years = min(max(int(years), 1), MAX_YEARS)
+
+    t = np.arange(years, dtype=float)
+    # Share of each year the activity runs for: 1, ..., 1, final part year, 0, ...
+    active = np.clip(durations[:, None] - t[None, :], 0, 1)
+    growth = (1 - settings.drop_off) ** t * (1 + settings.inflation) ** t
+    factors = discount_factors(years, settings)
+    values = annual[:, None] * active * growth[None, :]
+    return Projection(years=np.arange(1, years + 1), values=values, present_values=values * factors[None, :], factors=factors)
+
+
+def project_totals(totals, durations, settings: ProjectionSettings = ProjectionSettings()):
+    """Project activities whose ``totals`` are spread evenly over ``durations`` (years)."""
+    totals = np.nan_to_num(np.asarray(totals, dtype=float))
+    durations = np.nan_to_num(np.asarray(durations, dtype=float))
+    annual = np.divide(totals, durations, out=np.zeros_like(totals), where=durations > 0)
+    return project(annual, durations, settings)
+
+
+def project_results(results, settings: ProjectionSettings = ProjectionSettings(), value_column="Total Monetised Value (£)"):
+    """Project the estimated rows of a ``measureup.bulk.estimate_table`` result.
+
+    Each row's total is spread evenly over its "Duration (years)", which is
+    Unit 2 converted to years where Unit 2 is a duration and one year
+    otherwise. Rows that were not estimated contribute nothing.
+    """
+    totals = results[value_column].to_numpy(dtype=float)
+    durations = results["Duration (years)"].to_numpy(dtype=float)
+    ok = (results["Status"] == "ok").to_numpy() & ~np.isnan(totals)
+    return project_totals(np.where(ok, totals, 0), np.where(ok, durations, 0), settings)
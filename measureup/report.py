@@ -0,0 +1,74 @@
+"""The two-column Item/Value report offered for download on page 6."""
+
+import io
+from dataclasses import dataclass
+from typing import Mapping, Optional
+
+import pandas as pd
+
+from measureup.engine import EstimateInputs, EstimateResult, is_missing
+
+REPORT_COLUMNS = ["Item", "Value"]
+
+
+@dataclass(frozen=True)
+class ReportNotes:
+    """Free text the user entered along the way, copied into the report as is."""
+
+    stakeholders: str = ""
+    activity: str = ""
+    outcomes: str = ""
+    indicator_source: str = ""
+    impact_evidence: str = ""
+
+
+def report_items(row: Mapping, value_name: str, silver_name: Optional[str], inputs: EstimateInputs, result: EstimateResult, notes: ReportNotes, catalogue_version: Optional[str] = None):
+    """Ordered report lines as a dict of item label to value."""
+    report_data = {
+        "Stakeholders": notes.stakeholders,
+        "Activity": notes.activity,
+        "Outcomes": notes.outcomes,
+        "Selected Value Name": value_name,
+    }
+
+    if inputs.level == "Silver" and silver_name:
+        report_data["Silver Level"] = silver_name
+
+    report_data["Key"] = row.get("Key", "")
+    report_data["Description"] = row.get("Description", "")
+    report_data[f"Unit 1 ({row.get('Unit 1')})"] = inputs.unit1
+    if not is_missing(row.get("Unit 2")):
+        report_data[f"Unit 2 ({row.get('Unit 2')})"] = inputs.unit2
+
+    report_data["Indicator and Source"] = notes.indicator_source
+    report_data["Impact Evidence"] = notes.impact_evidence
+    report_data["Impact Discount Level"] = inputs.impact_level
+    report_data["Impact Discount (decimal)"] = result.impact_discount_percentage
+    report_data["Base Value Per Unit (£)"] = result.base_value_per_unit
+    report_data["Monetised Value Per Unit (£)"] = result.monetised_value_per_unit
+    report_data["Total Monetised Value (£)"] = result.total_monetised_value
+    report_data["Type of Monetised Value"] = inputs.value_type
+    report_data[f"Total Monetised Value ({inputs.value_type}) (£)"] = result.total_value_by_type
+    # Add Environmental metrics if applicable
+    if inputs.value_type == "Environmental" and result.kg_co2_value > 0:
+        report_data["Total kg CO2"] = result.kg_co2_value
+        report_data["Total tonnes CO2"] = result.kg_co2_value / 1000
+
+    # Add Wellbeing metrics if applicable
+    if inputs.value_type == "Wellbeing" and result.wellby_value > 0:
+        report_data["Total WELLBYs"] = result.wellby_value
+
+    # Which value list the figures came from, so reports can be traced after it is updated
+    if catalogue_version:
+        report_data["Catalogue Version"] = catalogue_version
+    return report_data
+
+
+def report_frame(report_data):
+    return pd.DataFrame(report_data.items(), columns=REPORT_COLUMNS)
+
+
+def report_csv(report_df):
+    csv_buffer = io.StringIO()
+    report_df.to_csv(csv_buffer, index=False)
+    return csv_buffer.getvalue()
@@ -0,0 +1,166 @@
+"""Scenario and sensitivity analysis for one catalogue row.
+
+Every Step 4 total is a per-unit figure times ``(1 - discount) × Unit 1 ×
+Unit 2``, so the per-unit figures are taken from ``measureup.engine.estimate``
+once and whole grids or Monte Carlo samples of the inputs are evaluated with
+NumPy broadcasting. A grid of a million points costs a few milliseconds.
+"""
+
+import math
+from dataclasses import dataclass
+from typing import Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+from measureup.engine import IMPACT_DISCOUNT_MAPPING, EstimateInputs, estimate
+
+# Metric -> per-unit field of EstimateResult it scales
+METRICS = {
+    "Total Monetised Value (£)": "monetised_value_per_unit",
+    "Total Monetised Value By Type (£)": "base_value_type",
+    "Total kg CO2": "kg_co2_per_unit",
+    "Total WELLBYs": "wellby_per_unit",
+}
+PERCENTILES = (5, 25, 50, 75, 95)
+DISTRIBUTIONS = ("fixed", "uniform", "triangular", "normal")
+# Above this many points the sample percentiles are estimated from a random subset
+SUMMARY_SAMPLE = 2_000_000
+
+
+def per_unit_values(row: Mapping, level, value_type):
+    """Undiscounted per-unit figure for each applicable metric, and whether Unit 2 applies."""
+    result = estimate(row, EstimateInputs(level=level, unit1=1, unit2=1, impact_level="No discount", value_type=value_type))
+    values = {}
+    for metric, field in METRICS.items():
+        value = getattr(result, field)
+        if value is not None:
+            values[metric] = float(value)
+    return values, result.has_unit2
+
+
+def unit_range(start, stop, steps):
+    """``steps`` evenly spaced values from ``start`` to ``stop`` inclusive."""
+    return np.linspace(start, stop, max(int(steps), 1))
+
+
+@dataclass(frozen=True)
+class Distribution:
+    """An uncertain input for Monte Carlo sampling; values are clipped to [low, high]."""
+
+    kind: str = "fixed"
+    low: float = 0.0
+    high: float = math.inf
+    # Fixed value, triangular peak or normal mean
+    mode: float = 0.0
+    sd: float = 0.0
+
+    @classmethod
+    def fixed(cls, value):
+        return cls("fixed", low=value, high=value, mode=value)
+
+    @classmethod
+    def uniform(cls, low, high):
+        return cls("uniform", low=low, high=high)
+
+    @classmethod
+    def triangular(cls, low, mode, high):
+        return cls("triangular", low=low, high=high, mode=mode)
+
+    @classmethod
+    def normal(cls, mean, sd, low=0.0, high=math.inf):
+        return cls("normal", low=low, high=high, mode=mean, sd=sd)
+
+    def sample(self, rng, size):
+        if self.kind == "fixed":
+            values = np.full(size, float(self.mode))
+        elif self.kind == "uniform":
+            values = rng.uniform(self.low, self.high, size)
+        elif self.kind == "triangular":
+            if self.low == self.high:
+                values = np.full(size, float(self.low))
+            else:
+                values = rng.triangular(self.low, min(max(self.mode, self.low), self.high), self.high, size)
+        elif self.kind == "normal":
+            values = rng.normal(self.mode, self.sd, size)
+        else:
+            raise ValueError(f"Unknown distribution {self.kind!r}, expected one of {DISTRIBUTIONS}")
+        return np.clip(values, self.low, self.high)
+
+
+@dataclass(frozen=True)
+class ScenarioResult:
+    """Per-unit figures and the input multiplier for every evaluated point.
+
+    ``multiplier`` is ``(1 - discount) × Unit 1 × Unit 2`` with one axis per
+    entry of ``axes`` for a grid, or a flat array of samples for Monte Carlo.
+    """
+
+    per_unit: dict
+    multiplier: np.ndarray
+    axes: dict
+
+    @property
+    def points(self):
+        return self.multiplier.size
+
+    def values(self, metric):
+        return self.per_unit[metric] * self.multiplier
+
+    def summary(self, percentiles=PERCENTILES, seed=0):
+        """One row per metric with min, mean, the given percentiles and max."""
+        flat = self.multiplier.ravel()
+        low, high, mean = flat.min(), flat.max(), flat.mean()
+        if flat.size > SUMMARY_SAMPLE:
+            flat = np.random.default_rng(seed).choice(flat, SUMMARY_SAMPLE, replace=False)
+        # Every metric is a constant times the multiplier, so one sort serves them all
+        quantiles = np.percentile(flat, percentiles)
+        rows = {}
+        for metric, per_unit in self.per_unit.items():
+            scaled = per_unit * quantiles
+            if per_unit < 0:
+                scaled = scaled[::-1]
+            row = {"Min": per_unit * (low if per_unit >= 0 else high), "Mean": per_unit * mean}
+            row.update({f"P{p}": value for p, value in zip(percentiles, scaled)})
+            row["Max"] = per_unit * (high if per_unit >= 0 else low)
+            rows[metric] = row
+        return pd.DataFrame.from_dict(rows, orient="index")
+
+    def histogram(self, metric, bins=40):
+        """Counts per value band, indexed by the band midpoint."""
+        counts, edges = np.histogram(self.values(metric).ravel(), bins=bins)
+        return pd.DataFrame({"Count": counts}, index=pd.Index((edges[:-1] + edges[1:]) / 2, name=metric))
+
+
+def scenario_grid(row: Mapping, level, value_type, impact_levels, unit1_values, unit2_values):
+    """Evaluate every combination of impact level, Unit 1 and Unit 2 in one pass.
+
+    The multiplier has shape (impact levels, Unit 1 values, Unit 2 values);
+    rows without a Unit 2 count it as 1, as in the wizard.
+    """
+    per_unit, has_unit2 = per_unit_values(row, level, value_type)
+    impact_levels = list(impact_levels)
+    factors = np.array([1 - IMPACT_DISCOUNT_MAPPING[impact] for impact in impact_levels], dtype=float)
+    unit1 = np.asarray(unit1_values, dtype=float)
+    unit2 = np.asarray(unit2_values, dtype=float) if has_unit2 else np.ones(1)
+    multiplier = factors[:, None, None] * unit1[None, :, None] * unit2[None, None, :]
+    return ScenarioResult(per_unit, multiplier, {"Impact level": impact_levels, "Unit 1": unit1, "Unit 2": unit2})
+
+
+def sensitivity_frame(result: ScenarioResult, metric, unit2_index=0, max_points=500):
+    """Metric against Unit 1 with one column per impact level, at one Unit 2 value."""
+    unit1 = result.axes["Unit 1"]
+    # Charts do not need every grid point
+    keep = np.unique(np.linspace(0, len(unit1) - 1, min(len(unit1), max_points)).astype(int))
+    values = result.per_unit[metric] * result.multiplier[:, keep, unit2_index]
+    return pd.DataFrame(values.T, index=pd.Index(unit1[keep], name="Unit 1"), columns=result.axes["Impact level"])
+
+
+def monte_carlo(row: Mapping, level, value_type, unit1: Distribution, unit2: Distribution, discount: Distribution, samples=100_000, seed: Optional[int] = None):
+    """Sample Unit 1, Unit 2 and the impact discount (a fraction) independently."""
+    per_unit, has_unit2 = per_unit_values(row, level, value_type)
+    rng = np.random.default_rng(seed)
+    multiplier = (1 - np.clip(discount.sample(rng, samples), 0, 1)) * unit1.sample(rng, samples)
+    if has_unit2:
+        multiplier *= unit2.sample(rng, samples)
+    return ScenarioResult(per_unit, multiplier, {"Sample": np.arange(samples)})
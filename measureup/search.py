@@ -0,0 +1,107 @@
+"""Ranked search over the catalogue's Value names.
+
+An inverted index (token -> Value name -> weighted term frequency) is built
+once per catalogue from Value name, Silver name and Description text, and
+queries are scored with TF-IDF. Query tokens also match longer catalogue
+tokens they are a prefix of, so partial words still find results.
+"""
+
+import bisect
+import math
+import re
+from dataclasses import dataclass
+
+import pandas as pd
+
+# Field -> weight of one occurrence
+FIELD_WEIGHTS = {"Value name": 3.0, "Silver name": 2.0, "Description": 1.0}
+# Score weight of a prefix-only match relative to an exact token match
+PREFIX_WEIGHT = 0.6
+# Activity/Outcomes text counts less than what the user typed into the search box
+CONTEXT_WEIGHT = 0.5
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it of on or that the this to was were will with "
+    "per year one no not vs value values person people".split()
+)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    tokens = []
+    for token in _TOKEN_RE.findall(str(text).lower()):
+        if token in STOPWORDS or len(token) < 2:
+            continue
+        # Light plural stemming so "homes" finds "home"
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+@dataclass(frozen=True)
+class SearchResult:
+    value_name: str
+    score: float
+
+
+class SearchIndex:
+    def __init__(self, frame):
+        self.names = []
+        postings = {}
+        doc_ids = {}
+
+        columns = [col for col in FIELD_WEIGHTS if col in frame.columns]
+        for values in zip(*(frame[col].tolist() for col in ["Value name"] + columns)):
+            name, fields = values[0], values[1:]
+            if pd.isna(name):
+                continue
+            if name not in doc_ids:
+                doc_ids[name] = len(self.names)
+                self.names.append(name)
+            doc = doc_ids[name]
+            for col, text in zip(columns, fields):
+                if pd.isna(text):
+                    continue
+                for token in tokenize(text):
+                    docs = postings.setdefault(token, {})
+                    docs[doc] = docs.get(doc, 0.0) + FIELD_WEIGHTS[col]
+
+        n_docs = max(len(self.names), 1)
+        # token -> list of (doc, tf-idf weight)
+        self.postings = {}
+        for token, docs in postings.items():
+            idf = math.log(1 + n_docs / len(docs))
+            self.postings[token] = [(doc, (1 + math.log(tf)) * idf) for doc, tf in docs.items()]
+        self.vocabulary = sorted(self.postings)
+
+    def _expand(self, token):
+        """Catalogue tokens matching ``token`` exactly or by prefix, with their match weight."""
+        matches = []
+        if token in self.postings:
+            matches.append((token, 1.0))
+        if len(token) >= 3:
+            start = bisect.bisect_left(self.vocabulary, token)
+            for candidate in self.vocabulary[start:start + 50]:
+                if not candidate.startswith(token):
+                    break
+                if candidate != token:
+                    matches.append((candidate, PREFIX_WEIGHT))
+        return matches
+
+    def search(self, query, context="", limit=10):
+        """Value names ranked by relevance to ``query`` and, more weakly, ``context``."""
+        weights = {}
+        for text, weight in ((query, 1.0), (context, CONTEXT_WEIGHT)):
+            for token in tokenize(text or ""):
+                weights[token] = max(weights.get(token, 0.0), weight)
+
+        scores = {}
+        for token, weight in weights.items():
+            for candidate, match in self._expand(token):
+                for doc, tfidf in self.postings[candidate]:
+                    scores[doc] = scores.get(doc, 0.0) + weight * match * tfidf
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], self.names[item[0]]))
+        return [SearchResult(self.names[doc], score) for doc, score in ranked[:limit]]
@@ -0,0 +1,207 @@
+"""SQLite store of saved estimates.
+
+Completed estimates are saved with their inputs, notes and results so they
+outlive a session and can be listed, filtered and aggregated with SQL. The
+database runs in WAL mode so reads never wait for a write, and the
+connections are pooled and shared by every session in the process.
+``MEASUREUP_DB`` overrides the database path.
+"""
+
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from measureup.catalogue import BASE_DIR
+from measureup.engine import is_missing, to_number
+from measureup.portfolio import NUMBER_COLUMNS, TEXT_COLUMNS
+
+DEFAULT_DB_PATH = os.environ.get("MEASUREUP_DB") or os.path.join(BASE_DIR, "measureup_estimates.db")
+POOL_SIZE = 4
+# Seconds a writer waits for another writer before giving up
+BUSY_TIMEOUT = 30
+
+NOTE_COLUMNS = ["Outcomes", "Indicator and Source", "Impact Evidence"]
+# Estimate column -> database column
+FIELDS = {
+    "Stakeholders": "stakeholders",
+    "Activity": "activity",
+    "Outcomes": "outcomes",
+    "Indicator and Source": "indicator_source",
+    "Impact Evidence": "impact_evidence",
+    "Value name": "value_name",
+    "Key": "key",
+    "Level": "level",
+    "Silver name": "silver_name",
+    "Impact level": "impact_level",
+    "Type of monetised value": "value_type",
+    "Catalogue version": "catalogue_version",
+    "Unit 1": "unit1",
+    "Unit 2": "unit2",
+    "Base Value Per Unit (£)": "base_value_per_unit",
+    "Total Monetised Value (£)": "total_monetised",
+    "Total Monetised Value By Type (£)": "total_by_type",
+    "Total kg CO2": "kg_co2",
+    "Total WELLBYs": "wellbys",
+}
+TEXT_FIELDS = TEXT_COLUMNS + NOTE_COLUMNS
+SAVED_COLUMNS = ["ID", "Created"] + TEXT_COLUMNS + NOTE_COLUMNS + NUMBER_COLUMNS
+
+# Grouping -> SQL expression, for aggregate()
+GROUPINGS = {
+    "value_type": ("Type of monetised value", "value_type"),
+    "stakeholder": ("Stakeholders", "stakeholders"),
+    "value_name": ("Value name", "value_name"),
+    "key": ("Key", "key"),
+    "month": ("Month", "substr(created_at, 1, 7)"),
+}
+TOTAL_COLUMNS = ["Activities", "Total Monetised Value (£)", "Total Monetised Value By Type (£)", "Total kg CO2", "Total WELLBYs"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS estimates (
+    id INTEGER PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    session_id TEXT,
+    {text_fields},
+    {number_fields}
+);
+CREATE INDEX IF NOT EXISTS estimates_key ON estimates (key);
+CREATE INDEX IF NOT EXISTS estimates_value_name ON estimates (value_name);
+CREATE INDEX IF NOT EXISTS estimates_value_type ON estimates (value_type);
+CREATE INDEX IF NOT EXISTS estimates_created_at ON estimates (created_at);
+""".format(
+    text_fields=",\n    ".join(f"{FIELDS[name]} TEXT NOT NULL DEFAULT ''" for name in TEXT_FIELDS),
+    number_fields=",\n    ".join(f"{FIELDS[name]} REAL NOT NULL DEFAULT 0" for name in NUMBER_COLUMNS),
+)
+
+
+class EstimateStore:
+    """Saved estimates in the SQLite database at ``path``."""
+
+    def __init__(self, path=DEFAULT_DB_PATH, pool_size=POOL_SIZE):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._pool = queue.LifoQueue()
+        for _ in range(pool_size):
+            self._pool.put(self._open())
+        with self._connection() as conn:
+            conn.executescript(SCHEMA)
+
+    def _open(self):
+        # Connections move between Streamlit script threads, but only one holds each at a time
+        conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def _connection(self):
+        conn = self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    def close(self):
+        while not self._pool.empty():
+            self._pool.get_nowait().close()
+
+    def save(self, item, session_id=None):
+        """Insert one estimate (a mapping of ``FIELDS`` names to values); returns its ID."""
+        values = {"created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"), "session_id": session_id}
+        for name in TEXT_FIELDS:
+            value = item.get(name)
+            values[FIELDS[name]] = "" if is_missing(value) else str(value)
+        for name in NUMBER_COLUMNS:
+            values[FIELDS[name]] = to_number(item.get(name))
+        columns = ", ".join(values)
+        placeholders = ", ".join(f":{column}" for column in values)
+        with self._connection() as conn:
+            return conn.execute(f"INSERT INTO estimates ({columns}) VALUES ({placeholders})", values).lastrowid
+
+    def delete(self, estimate_id):
+        with self._connection() as conn:
+            return conn.execute("DELETE FROM estimates WHERE id = ?", (estimate_id,)).rowcount > 0
+
+    def get(self, estimate_id):
+        """One saved estimate as a dict of ``SAVED_COLUMNS``, or None."""
+        frame = self._query(f"SELECT {self._select_columns()} FROM estimates WHERE id = ?", [estimate_id])
+        return frame.iloc[0].to_dict() if len(frame) else None
+
+    def list(self, limit=100, offset=0, **filters):
+        """Saved estimates matching ``filters``, newest first."""
+        where, params = self._where(filters)
+        sql = f"SELECT {self._select_columns()} FROM estimates{where} ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?"
+        return self._query(sql, params + [limit, offset])
+
+    def count(self, **filters):
+        where, params = self._where(filters)
+        with self._connection() as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM estimates{where}", params).fetchone()[0]
+
+    def aggregate(self, grouping, **filters):
+        """Totals per ``grouping`` (one of ``GROUPINGS``) computed by SQLite."""
+        label, expression = GROUPINGS[grouping]
+        where, params = self._where(filters)
+        sql = (
+            f"SELECT {expression} AS label, COUNT(*), SUM(total_monetised), SUM(total_by_type), SUM(kg_co2), SUM(wellbys) "
+            f"FROM estimates{where} GROUP BY label ORDER BY SUM(total_monetised) DESC"
+        )
+        with self._connection() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        return pd.DataFrame(
+            [row[1:] for row in rows],
+            index=pd.Index([row[0] or "(not given)" for row in rows], name=label),
+            columns=TOTAL_COLUMNS,
+        )
+
+    @staticmethod
+    def _select_columns():
+        return ", ".join(["id", "created_at"] + [FIELDS[name] for name in TEXT_FIELDS + NUMBER_COLUMNS])
+
+    def _query(self, sql, params):
+        with self._connection() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        return pd.DataFrame(rows, columns=SAVED_COLUMNS)
+
+    @staticmethod
+    def _where(filters):
+        """SQL WHERE clause for the supported filters; unknown filters raise TypeError."""
+        clauses, params = [], []
+        for name, value in filters.items():
+            if value is None or value == "":
+                continue
+            if name in ("key", "value_name", "value_type", "session_id"):
+                clauses.append(f"{name} = ?")
+            elif name == "since":
+                clauses.append("created_at >= ?")
+            elif name == "until":
+                clauses.append("created_at < ?")
+            elif name == "search":
+                # Case-insensitive substring of the Value name or activity
+                clauses.append("(value_name LIKE ? OR activity LIKE ?)")
+                params += [f"%{value}%"] * 2
+                continue
+            else:
+                raise TypeError(f"Unknown filter {name!r}")
+            params.append(value.isoformat() if hasattr(value, "isoformat") else value)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(path=DEFAULT_DB_PATH):
+    """The process-wide store for ``path``, opened on first use."""
+    path = os.path.abspath(path)
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = _stores[path] = EstimateStore(path)
+        return store
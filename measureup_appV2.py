@@ -2,85 +2,201 @@ import streamlit as st
 import pandas as pd
 import io
 import os
+import uuid
+from PIL import Image
+
+from measureup.bulk import INPUT_COLUMNS, RESULT_DTYPES, estimate_table
+from measureup.catalogue import current_catalogue, start_watcher
+from measureup.engine import IMPACT_LEVELS, LEVELS, VALUE_TYPES, EstimateInputs, duration_years, impact_discount
+from measureup.export import EXPORT_FORMATS, export_spooled
+from measureup.memo import memo as estimate_memo
+from measureup.portfolio import PORTFOLIO_DTYPES, Portfolio
+from measureup.projection import GREEN_BOOK_DISCOUNT_RATE, MAX_YEARS, PROJECTION_DTYPES, ProjectionSettings, project_results
+from measureup.store import GROUPINGS as SAVED_GROUPINGS, get_store
+from measureup.scenarios import Distribution, monte_carlo, scenario_grid, sensitivity_frame, unit_range
+from measureup.profiling import PROFILE_ENABLED, registry as profile_registry, start_rerun
+from measureup.report import ReportNotes, report_frame
 
 # Page configuration
 st.set_page_config(page_title="MeasureUp Estimator App", layout="centered")
 
-# Initialize session state for page navigation
-if 'current_page' not in st.session_state:
-    st.session_state.current_page = 1
-
-# Initialize session state variables for data persistence
-if 'stakeholders' not in st.session_state:
-    st.session_state.stakeholders = ""
-if 'activity' not in st.session_state:
-    st.session_state.activity = ""
-if 'outcomes' not in st.session_state:
-    st.session_state.outcomes = ""
-if 'selected_category' not in st.session_state:
-    st.session_state.selected_category = None
-if 'selected_level' not in st.session_state:
-    st.session_state.selected_level = "Bronze"
-if 'selected_silver' not in st.session_state:
-    st.session_state.selected_silver = None
-if 'unit1' not in st.session_state:
-    st.session_state.unit1 = 0
-if 'unit2' not in st.session_state:
-    st.session_state.unit2 = 1
-if 'indicator_source' not in st.session_state:
-    st.session_state.indicator_source = ""
-if 'impact_level' not in st.session_state:
-    st.session_state.impact_level = "Low"
-if 'impact_evidence' not in st.session_state:
-    st.session_state.impact_evidence = ""
-if 'value_type' not in st.session_state:
-    st.session_state.value_type = "Economic"
-if 'row_data' not in st.session_state:
-    st.session_state.row_data = pd.DataFrame()
-# Add new session state variables for calculated values
-if 'base_value_per_unit' not in st.session_state:
-    st.session_state.base_value_per_unit = 0
-if 'impact_discount_percentage' not in st.session_state:
-    st.session_state.impact_discount_percentage = 0
-if 'monetised_value_per_unit' not in st.session_state:
-    st.session_state.monetised_value_per_unit = 0
-if 'total_monetised_value' not in st.session_state:
-    st.session_state.total_monetised_value = 0
-if 'base_value_type' not in st.session_state:
-    st.session_state.base_value_type = 0
-if 'total_value_by_type' not in st.session_state:
-    st.session_state.total_value_by_type = 0
-if 'unit2_value' not in st.session_state:
-    st.session_state.unit2_value = None
+# Per-rerun timings, a no-op unless MEASUREUP_PROFILE is set (see measureup/profiling.py)
+if 'session_id' not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex[:12]
+rerun_profile = start_rerun(st.session_state.session_id, st.session_state.get('current_page', 1))
+
+# Session state defaults, filled in on a session's first run and after Start Over
+SESSION_DEFAULTS = {
+    "current_page": 1,
+    # Data persistence across pages
+    "stakeholders": "",
+    "activity": "",
+    "outcomes": "",
+    "selected_category": None,
+    "selected_level": "Bronze",
+    "selected_silver": None,
+    "unit1": 0,
+    "unit2": 1,
+    "indicator_source": "",
+    "impact_level": "Low",
+    "impact_evidence": "",
+    "value_type": "Economic",
+    # Selected catalogue row as (value name, level, silver name); row attributes are
+    # resolved from the shared catalogue so sessions never hold DataFrame slices
+    "selection": None,
+    # Calculated values
+    "base_value_per_unit": 0,
+    "impact_discount_percentage": 0,
+    "monetised_value_per_unit": 0,
+    "total_monetised_value": 0,
+    "base_value_type": 0,
+    "total_value_by_type": 0,
+    "unit2_value": None,
+}
+for key, value in SESSION_DEFAULTS.items():
+    if key not in st.session_state:
+        st.session_state[key] = value
+if 'portfolio' not in st.session_state:
+    st.session_state.portfolio = Portfolio()
 
 # Get folder where this script lives
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 # Paths relative to the repo
 logo_path = os.path.join(BASE_DIR, "logo.jpg")
 excel_path = os.path.join(BASE_DIR, "value_list.xlsx")
+LOGO_WIDTH = 300
+
+
+@st.cache_resource
+def load_logo(path, width):
+    # The logo is ~2000px wide but shown at 300px; downscale once per process (2x for high-DPI screens)
+    with Image.open(path) as image:
+        image = image.convert("RGB")
+        image.thumbnail((width * 2, image.height))
+        buffer = io.BytesIO()
+        image.save(buffer, format="JPEG", quality=90)
+    return buffer.getvalue()
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def estimate_upload(data, file_name, catalogue_version, _catalogue):
+    # Bulk Estimate results per uploaded file and catalogue version, so widget changes on
+    # the page (download format, projection inputs) do not re-read and re-estimate the table
+    if file_name.lower().endswith(".xlsx"):
+        activities = pd.read_excel(io.BytesIO(data))
+    else:
+        activities = pd.read_csv(io.BytesIO(data))
+    results = estimate_table(_catalogue, activities)
+    results["Catalogue version"] = catalogue_version
+    return results
 
-st.image(logo_path, width=300)
-st.title("MeasureUp Estimator App")
+
+with rerun_profile.stage("header"):
+    st.image(load_logo(logo_path, LOGO_WIDTH), width=LOGO_WIDTH)
+    st.title("MeasureUp Estimator App")
 
 try:
-    df = pd.read_excel(excel_path)
+    with rerun_profile.stage("load_catalogue"):
+        # Parsed once per process and shared across sessions, see measureup/catalogue.py.
+        # A background watcher swaps in a replaced workbook; each session keeps the
+        # version it started with until it goes back to the start page.
+        start_watcher(excel_path)
+        if st.session_state.current_page == 1:
+            st.session_state.catalogue_version = None
+        catalogue = current_catalogue(excel_path, st.session_state.get('catalogue_version'))
+        st.session_state.catalogue_version = catalogue.version
+        df = catalogue.frame
 except Exception as e:
     st.error(f"Error loading Excel file: {e}")
+    rerun_profile.finish()
     st.stop()
 
 
-# Initialize session state for page navigation
-if 'current_page' not in st.session_state:
-    st.session_state.current_page = 1  # 1 = Start page
-
-
 # Navigation function MUST be defined before it's used
 def go_to_page(page_num):
     st.session_state.current_page = page_num
+    rerun_profile.finish()
     st.rerun()
 
+# Page number -> render function, see page() below
+PAGES = {}
+
+def page(number):
+    """Register a page renderer, run as a fragment so its widgets only rerun the page.
+    
+    Navigation calls st.rerun(), which reruns the whole script. Fragment reruns
+    are profiled separately under "<page> fragment".
+    """
+    def register(render):
+        @st.fragment
+        def fragment():
+            global rerun_profile
+            if not rerun_profile.finished:
+                render()
+                return
+            # A fragment rerun: the full run's timings have already been recorded
+            rerun_profile = start_rerun(st.session_state.session_id, f"{number} fragment")
+            try:
+                render()
+            finally:
+                rerun_profile.finish()
+        PAGES[number] = fragment
+        return fragment
+    return register
+
+def current_inputs():
+    return EstimateInputs(
+        level=st.session_state.selected_level,
+        unit1=st.session_state.unit1,
+        unit2=st.session_state.unit2,
+        impact_level=st.session_state.impact_level,
+        value_type=st.session_state.value_type,
+    )
+
+def projection_section(projector, key):
+    # Multi-year present values of estimated activities, see measureup/projection.py.
+    # projector turns ProjectionSettings into a Projection.
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        discount_rate = st.number_input("Discount rate (%):", min_value=0.0, max_value=100.0, value=GREEN_BOOK_DISCOUNT_RATE * 100, step=0.5, key=f"{key}_discount")
+        declining = st.checkbox("Green Book declining rates", key=f"{key}_declining", help="3.5% for years 0-30, then 3%, 2.5%, ... for later years")
+    with col2:
+        drop_off = st.number_input("Drop-off per year (%):", min_value=0.0, max_value=100.0, value=0.0, step=5.0, key=f"{key}_drop_off")
+    with col3:
+        inflation = st.number_input("Inflation uplift per year (%):", min_value=-50.0, max_value=100.0, value=0.0, step=0.5, key=f"{key}_inflation")
+    
+    settings = ProjectionSettings(discount_rate=discount_rate / 100, declining=declining, drop_off=drop_off / 100, inflation=inflation / 100)
+    with rerun_profile.stage("projection"):
+        yearly = projector(settings).yearly_frame()
+    st.caption(f"Unit 2 is spread over the years when it counts years or weeks; other activities count as one year. At most {MAX_YEARS} years are projected.")
+    st.write(f"**Total value over {len(yearly)} years in £:** {yearly['Value (£)'].sum():.2f}")
+    st.write(f"**Total present value in £:** {yearly['Present Value (£)'].sum():.2f}")
+    st.bar_chart(yearly.set_index("Year")[["Value (£)", "Present Value (£)"]], stack=False)
+    st.dataframe(yearly, hide_index=True, use_container_width=True)
+    download_table("📥 Download Projection", yearly, "measureup_projection", f"{key}_download", PROJECTION_DTYPES)
+
+def download_table(label, table, file_stem, key, dtypes=None):
+    # Format picker plus a download button; the export is only built when the button is clicked.
+    # dtypes types the Parquet columns, see measureup/export.py
+    fmt = st.selectbox("Download format", list(EXPORT_FORMATS), format_func=str.upper, key=f"{key}_format")
+    extension, mime = EXPORT_FORMATS[fmt]
+
+    def export():
+        with export_spooled(table, fmt, dtypes=dtypes) as spool:
+            return spool.read()
+
+    st.download_button(
+        label=f"{label} as {fmt.upper()}",
+        data=export,
+        file_name=file_stem + extension,
+        mime=mime,
+        use_container_width=True,
+        key=key
+    )
+
 # ============== PAGE 1: Start / Guidance ==============
-if st.session_state.current_page == 1:
+@page(1)
+def render_start():
     st.markdown("<h2 style='color:#4b0082;'>Welcome to the MeasureUp Estimator App</h2>", unsafe_allow_html=True)
 
     st.markdown("""
@@ -142,7 +258,8 @@ Final Step: Review and download your results.
 
     st.markdown("### Tips")
     st.markdown("""
-    - Save or download your report after each run if you are testing multiple activities.
+    - Save or download your report after each run, or add it to your portfolio, if you are testing multiple activities.
+    - To value many activities at once, use Bulk Estimate and upload them as a CSV or Excel table.
     - Use clear, specific descriptions for stakeholders and outcomes.
     - If you are unsure which level to pick, start with Bronze.
     """)
@@ -157,9 +274,14 @@ Final Step: Review and download your results.
     with col2:
         if st.button("Start", type="primary", use_container_width=True):
             go_to_page(2)
+        if st.button("Bulk Estimate", use_container_width=True):
+            go_to_page(7)
+        if st.button("Saved Estimates", use_container_width=True):
+            go_to_page(8)
 
 # ============== PAGE 2: Stakeholders, Activity, Outcomes ==============
-if st.session_state.current_page == 2:
+@page(2)
+def render_stakeholders():
     st.markdown("<h3 style='color: green;'>Step 1: Determine the Stakeholders, and Describe Activity and Outcomes</h3>", unsafe_allow_html=True)
     
     st.session_state.stakeholders = st.text_area(
@@ -190,11 +312,29 @@ if st.session_state.current_page == 2:
             go_to_page(3)
 
 # ============== PAGE 3: Match with MeasureUp Value ==============
-elif st.session_state.current_page == 3:
+@page(3)
+def render_select_value():
     st.markdown("<h3 style='color: orange;'>Step 2: Match the activities or outcomes with MeasureUp values</h3>", unsafe_allow_html=True)
     
-    # Dropdown for Value Name
-    categories = sorted(df["Value name"].dropna().unique())
+    # Dropdown for Value Name (presorted once when the catalogue loads)
+    categories = catalogue.index.categories
+    
+    # Rank values against the search box and the Step 1 descriptions
+    search_query = st.text_input(
+        "Search MeasureUp values:",
+        key="value_search",
+        placeholder="e.g. job, mental health, recycling",
+        help="Matches Value names, Silver names and descriptions. Your activity and outcomes text is used to suggest values too."
+    )
+    with rerun_profile.stage("search"):
+        matches = catalogue.search.search(search_query, context=f"{st.session_state.activity} {st.session_state.outcomes}")
+    if search_query.strip():
+        if matches:
+            categories = [match.value_name for match in matches]
+        else:
+            st.info("No values match your search. Showing all values.")
+    elif matches:
+        st.caption("Suggested from your activity and outcomes: " + ", ".join(match.value_name for match in matches[:3]))
     if st.session_state.selected_category not in categories and len(categories) > 0:
         st.session_state.selected_category = categories[0]
     
@@ -206,25 +346,21 @@ elif st.session_state.current_page == 3:
     )
     
     # Dropdown for Level
-    level_options = ["Bronze", "Silver"]
     st.session_state.selected_level = st.selectbox(
         "Select Level:",
-        level_options,
-        index=level_options.index(st.session_state.selected_level),
+        LEVELS,
+        index=LEVELS.index(st.session_state.selected_level),
         key="level_select"
     )
     
     # Handle display based on level
     if st.session_state.selected_level == "Silver":
-        silver_rows = df[df["Value name"] == st.session_state.selected_category]
-        
-        if "Silver adjustment factors" in silver_rows.columns:
-            silver_factors = silver_rows["Silver adjustment factors"].dropna().unique()
+        if "Silver adjustment factors" in df.columns:
+            silver_factors = catalogue.index.silver_factors.get(st.session_state.selected_category, [])
             factors_text = ", ".join(map(str, silver_factors)) if len(silver_factors) > 0 else "None"
             st.write(f"**Silver Adjustment Factors:** {factors_text}")
         
-        silver_options = silver_rows["Silver name"].dropna().unique()
-        silver_options = [s for s in silver_options if s != "NA"]
+        silver_options = catalogue.index.silver_options.get(st.session_state.selected_category, [])
         
         if len(silver_options) > 0:
             if st.session_state.selected_silver not in silver_options:
@@ -233,50 +369,48 @@ elif st.session_state.current_page == 3:
             st.session_state.selected_silver = st.selectbox(
                 "Select Silver Differentiation:",
                 silver_options,
-                index=list(silver_options).index(st.session_state.selected_silver) if st.session_state.selected_silver in silver_options else 0,
+                index=silver_options.index(st.session_state.selected_silver) if st.session_state.selected_silver in silver_options else 0,
                 key="silver_select"
             )
-            st.session_state.row_data = df[(df["Value name"] == st.session_state.selected_category) & 
-                                          (df["Silver name"] == st.session_state.selected_silver)]
+            st.session_state.selection = (st.session_state.selected_category, "Silver", st.session_state.selected_silver)
         else:
             st.info("No Silver levels available. Showing Description and Bronze value by default.")
-            st.session_state.row_data = df[df["Value name"] == st.session_state.selected_category]
+            st.session_state.selection = (st.session_state.selected_category, "Silver", None)
         
-        available_cols = [col for col in df.columns if col.strip().lower() in 
-                         ["key","description", "unit 1", "unit 2", "silver values", "fiscal", "economic", "social", "environmental"]]
+        available_cols = [col for col in ["Key", "Description", "Unit 1", "Unit 2", "Silver values", "Fiscal", "Economic", "Social", "Environmental"] if col in df.columns]
     else:  # Bronze level
-        st.session_state.row_data = df[(df["Value name"] == st.session_state.selected_category) & 
-                                       (df["Level"].str.strip().str.lower() == "bronze")]
-        available_cols = [col for col in df.columns if col.strip().lower() in 
-                         ["key","description", "unit 1", "unit 2", "bronze value", "fiscal", "economic", "social", "environmental","URL"]]
+        st.session_state.selection = (st.session_state.selected_category, "Bronze", None)
+        available_cols = [col for col in ["Key", "Description", "Unit 1", "Unit 2", "Bronze Value", "Fiscal", "Economic", "Social", "Environmental"] if col in df.columns]
     
     # Display the data
+    row = catalogue.row(st.session_state.selection)
     with st.expander("MeasureUp Value Information", expanded=True):
-        if not st.session_state.row_data.empty:
-            box_html = """
-            <div style="
-                background-color:#fffaf0;
-                padding:15px;
-                border-radius:10px;
-                border:1px solid #ffcc80;
-                box-shadow:0 2px 8px rgba(255,140,0,0.15);
-                margin-top:10px;
-            ">
-            """
+        if row is not None:
+            with rerun_profile.stage("info_box_html"):
+                box_html = """
+                <div style="
+                    background-color:#fffaf0;
+                    padding:15px;
+                    border-radius:10px;
+                    border:1px solid #ffcc80;
+                    box-shadow:0 2px 8px rgba(255,140,0,0.15);
+                    margin-top:10px;
+                ">
+                """
             
-            for col in available_cols:
-                if col in st.session_state.row_data.columns and pd.notna(st.session_state.row_data[col].iloc[0]):
-                    box_html += f"<div style='margin:6px 0;'><b style='color:#ff8c00;'>{col}:</b> {st.session_state.row_data[col].iloc[0]}</div>"
-             # Add URL link if it exists
-            if 'URL' in st.session_state.row_data.columns and pd.notna(st.session_state.row_data['URL'].iloc[0]):
-                url = st.session_state.row_data['URL'].iloc[0]
-                box_html += f"""<div style='margin:10px 0 0 0;'>
-                 <b style='color:#ff8c00;'>More information:</b> 
-                    <a href="{url}" target="_blank" 
-                    style="color:#0066cc; text-decoration:underline;">Click here</a></div>"""
+                for col in available_cols:
+                    if col in row and pd.notna(row[col]):
+                        box_html += f"<div style='margin:6px 0;'><b style='color:#ff8c00;'>{col}:</b> {row[col]}</div>"
+                 # Add URL link if it exists
+                if 'URL' in row and pd.notna(row['URL']):
+                    url = row['URL']
+                    box_html += f"""<div style='margin:10px 0 0 0;'>
+                     <b style='color:#ff8c00;'>More information:</b> 
+                        <a href="{url}" target="_blank" 
+                        style="color:#0066cc; text-decoration:underline;">Click here</a></div>"""
              
-            # Close the box
-            box_html += "</div>"
+                # Close the box
+                box_html += "</div>"
             st.markdown(box_html, unsafe_allow_html=True)
         else:
             st.warning("No MeasureUp row selected.")
@@ -291,7 +425,8 @@ elif st.session_state.current_page == 3:
             go_to_page(4)
 
 # ============== PAGE 4: Record Activity Details ==============
-elif st.session_state.current_page == 4:
+@page(4)
+def render_units_and_impact():
     st.markdown("<h3 style='color: teal;'>Step 3: Record the details of your activity/outcome and the MeasureUp value</h3>", unsafe_allow_html=True)
     
     st.session_state.indicator_source = st.text_area(
@@ -301,11 +436,12 @@ elif st.session_state.current_page == 4:
         key="indicator_input"
     )
     
-    if not st.session_state.row_data.empty:
+    row = catalogue.row(st.session_state.selection)
+    if row is not None:
         col1, col2 = st.columns(2)
         
         with col1:
-            unit1_label = f"Unit 1 ({st.session_state.row_data['Unit 1'].iloc[0]})" if 'Unit 1' in st.session_state.row_data else "Unit 1"
+            unit1_label = f"Unit 1 ({row['Unit 1']})" if 'Unit 1' in row else "Unit 1"
             st.session_state.unit1 = st.number_input(
                 unit1_label,
                 min_value=0,
@@ -315,7 +451,7 @@ elif st.session_state.current_page == 4:
                 key="unit1_input"
             )
         
-        st.session_state.unit2_value = st.session_state.row_data['Unit 2'].iloc[0] if 'Unit 2' in st.session_state.row_data else None
+        st.session_state.unit2_value = row.get('Unit 2')
         if pd.notna(st.session_state.unit2_value):
             with col2:
                 unit2_label = f"Unit 2 ({st.session_state.unit2_value})"
@@ -344,13 +480,12 @@ elif st.session_state.current_page == 4:
     
     st.session_state.impact_level = st.selectbox(
         "Estimate of what would have happened anyway (defines amount of discount to your value):",
-        ["No discount","Low", "Medium", "High"],
-        index=["No discount","Low", "Medium", "High"].index(st.session_state.impact_level),
+        IMPACT_LEVELS,
+        index=IMPACT_LEVELS.index(st.session_state.impact_level),
         key="impact_level_select"
     )
     
-    impact_discount_mapping = {"No discount": 0, "Low": 0.25, "Medium": 0.5, "High": 0.75}
-    st.session_state.impact_discount_percentage = impact_discount_mapping.get(st.session_state.impact_level, 0)
+    st.session_state.impact_discount_percentage = impact_discount(st.session_state.impact_level)
     st.write(f"**Impact Discount (decimal):** {st.session_state.impact_discount_percentage}")
     
     st.markdown("---")
@@ -363,91 +498,163 @@ elif st.session_state.current_page == 4:
             go_to_page(5)
 
 # ============== PAGE 5: Calculate Monetised Value ==============
-elif st.session_state.current_page == 5:
+@page(5)
+def render_calculate():
     st.markdown("<h3 style='color: purple;'>Step 4: Calculate the monetised value of your impact</h3>", unsafe_allow_html=True)
     
-    if not st.session_state.row_data.empty:
-        # Get available columns based on level
-        if st.session_state.selected_level == "Silver":
-            available_cols = [col for col in df.columns if col.strip().lower() in 
-                             ["description", "unit 1", "unit 2", "silver values", "fiscal", "economic", "social", "environmental"]]
-        else:
-            available_cols = [col for col in df.columns if col.strip().lower() in 
-                             ["description", "unit 1", "unit 2", "bronze value", "fiscal", "economic", "social", "environmental"]]
-        
-        value_columns = [col for col in available_cols if "value" in col.lower()]
-        st.session_state.base_value_per_unit = st.session_state.row_data[value_columns[0]].iloc[0] if value_columns else 0
-        
-        if st.session_state.base_value_per_unit == 0:
-            st.warning("No monetary value column found in the selected row. Using 0 as default.")
-        
-        st.session_state.monetised_value_per_unit = st.session_state.base_value_per_unit * (1 - st.session_state.impact_discount_percentage)
-        st.session_state.total_monetised_value = st.session_state.monetised_value_per_unit * st.session_state.unit1 * (st.session_state.unit2 if pd.notna(st.session_state.unit2_value) else 1)
-        
-        st.write(f"**Base value per unit in £:** {st.session_state.base_value_per_unit}")
-        st.write(f"**Impact discount applied:** {st.session_state.impact_discount_percentage}")
-        st.write(f"**Monetised value per unit (discount applied) in £:** {st.session_state.monetised_value_per_unit:.2f}")
-        st.write(f"**Total monetised value (discount applied and multiplied with unit 1 and unit 2) in £:** {st.session_state.total_monetised_value:.2f}")
+    if 'kg_co2_value' not in st.session_state:
+        st.session_state.kg_co2_value = 0
+    if 'wellby_value' not in st.session_state:
+        st.session_state.wellby_value = 0
+
+    result = None
+    row = catalogue.row(st.session_state.selection)
+    if row is not None:
+        # The totals are shown above the value type selector, so fill them in once it has been read
+        summary = st.container()
         
         st.markdown("---")
-        if 'kg_co2_value' not in st.session_state:
-         st.session_state.kg_co2_value = 0
-        if 'wellby_value' not in st.session_state:
-         st.session_state.wellby_value = 0
         # Type of Monetised Value
         st.session_state.value_type = st.selectbox(
             "Select Type of Monetised Value:",
-            ["Economic", "Fiscal", "Wellbeing", "Environmental"],
-            index=["Economic", "Fiscal", "Wellbeing", "Environmental"].index(st.session_state.value_type),
+            VALUE_TYPES,
+            index=VALUE_TYPES.index(st.session_state.value_type),
             key="value_type_select"
         )
         
-        value_type_column_mapping = {"Economic": "Economic", "Fiscal": "Fiscal", "Wellbeing": "Social", "Environmental": "Environmental"}
-        selected_value_column = value_type_column_mapping.get(st.session_state.value_type, None)
+        # All formulas live in measureup/engine.py; results are shared across sessions by measureup/memo.py
+        with rerun_profile.stage("calculate"):
+            result = estimate_memo.get(catalogue, st.session_state.selection, current_inputs()).result
+        st.session_state.base_value_per_unit = result.base_value_per_unit
+        st.session_state.impact_discount_percentage = result.impact_discount_percentage
+        st.session_state.monetised_value_per_unit = result.monetised_value_per_unit
+        st.session_state.total_monetised_value = result.total_monetised_value
+        st.session_state.base_value_type = result.base_value_type
+        st.session_state.total_value_by_type = result.total_value_by_type
+        st.session_state.kg_co2_value = result.kg_co2_value
+        st.session_state.wellby_value = result.wellby_value
         
-        if selected_value_column and selected_value_column in st.session_state.row_data.columns:
-            st.session_state.base_value_type = st.session_state.row_data[selected_value_column].iloc[0]
-        else:
-            st.session_state.base_value_type = 0
+        with summary:
+            if result.base_value_per_unit == 0:
+                st.warning("No monetary value column found in the selected row. Using 0 as default.")
+            
+            st.write(f"**Base value per unit in £:** {result.base_value_per_unit}")
+            st.write(f"**Impact discount applied:** {result.impact_discount_percentage}")
+            st.write(f"**Monetised value per unit (discount applied) in £:** {result.monetised_value_per_unit:.2f}")
+            st.write(f"**Total monetised value (discount applied and multiplied with unit 1 and unit 2) in £:** {result.total_monetised_value:.2f}")
+        
+        if not result.has_value_type_column:
             st.warning(f"No value found for {st.session_state.value_type}. Using 0 as default.")
         
-        st.session_state.total_value_by_type = st.session_state.base_value_type * st.session_state.unit1 * st.session_state.unit2 * (1 - st.session_state.impact_discount_percentage)
-        st.write(f"**Base value for {st.session_state.value_type} in £:** {st.session_state.base_value_type}")
-        st.write(f"**Total Monetised Value ({st.session_state.value_type}) after discount and multiplied with unit 1 and unit 2 in £:** {st.session_state.total_value_by_type:.2f}")
+        st.write(f"**Base value for {st.session_state.value_type} in £:** {result.base_value_type}")
+        st.write(f"**Total Monetised Value ({st.session_state.value_type}) after discount and multiplied with unit 1 and unit 2 in £:** {result.total_value_by_type:.2f}")
         
     else:
         st.error("No data available. Please complete Steps 2 and 3.")
     
     st.markdown("---")
-    # If Environmental: Calculate kg CO2
+    # If Environmental: show kg CO2
     if st.session_state.value_type == "Environmental":
         st.markdown("<p style='font-size:16px; font-weight:bold; color:green;'>Carbon Emissions</p>", unsafe_allow_html=True)
     
-        if 'kg CO2e' in st.session_state.row_data.columns and pd.notna(st.session_state.row_data['kg CO2e'].iloc[0]):
-            kg_co2_per_unit = st.session_state.row_data['kg CO2e'].iloc[0]
-            st.session_state.kg_co2_value = kg_co2_per_unit * st.session_state.unit1 * st.session_state.unit2 * (1 - st.session_state.impact_discount_percentage)
-        
-            st.write(f"**kg CO2 per unit:** {kg_co2_per_unit}")
-            st.write(f"**Total kg CO2 (kg CO2 x unit 1 x unit 2) after discount:** {st.session_state.kg_co2_value:.2f}")
-            st.write(f"**Total tonnes CO2:** {st.session_state.kg_co2_value / 1000:.2f}")
+        if result is not None and result.kg_co2_per_unit is not None:
+            st.write(f"**kg CO2 per unit:** {result.kg_co2_per_unit}")
+            st.write(f"**Total kg CO2 (kg CO2 x unit 1 x unit 2) after discount:** {result.kg_co2_value:.2f}")
+            st.write(f"**Total tonnes CO2:** {result.kg_co2_value / 1000:.2f}")
         else:
-            st.session_state.kg_co2_value = 0
             st.info("No kg CO2 data available in the selected row.")
-    # If Wellbeing: Calculate WELLBY
+    # If Wellbeing: show WELLBY
     elif st.session_state.value_type == "Wellbeing":
         st.markdown("<p style='font-size:16px; font-weight:bold; color:purple;'>WELLBY Value</p>", unsafe_allow_html=True)
 
-        has_col = 'WELLBY' in st.session_state.row_data.columns
-        val = st.session_state.row_data['WELLBY'].iloc[0] if has_col else None
-
-        if has_col and pd.notna(val) and val != 0:
-            wellby_per_unit = val
-            st.session_state.wellby_value = wellby_per_unit * st.session_state.unit1 * st.session_state.unit2 * (1 - st.session_state.impact_discount_percentage)
-            st.write(f"**WELLBY per unit:** {wellby_per_unit}")
-            st.write(f"**Total WELLBYs (WELLBY per unit × Unit 1 × Unit 2) after discount:** {st.session_state.wellby_value:.2f}")
+        if result is not None and result.wellby_per_unit is not None:
+            st.write(f"**WELLBY per unit:** {result.wellby_per_unit}")
+            st.write(f"**Total WELLBYs (WELLBY per unit × Unit 1 × Unit 2) after discount:** {result.wellby_value:.2f}")
             st.info("One WELLBY represents a one-point increase in life satisfaction (0–10 scale) for one person for one year.")
         else:
             st.info("No wellbeing data available for this value or this wellbeing value is not calculated using the WELLBY methodology.")
+    
+    # Scenario analysis, computed only while switched on (see measureup/scenarios.py)
+    if row is not None and st.checkbox("🔬 Explore scenarios", key="scenario_mode"):
+        st.markdown("<p style='font-size:16px; font-weight:bold; color:purple;'>Scenario Analysis</p>", unsafe_allow_html=True)
+        grid_tab, mc_tab = st.tabs(["Sensitivity grid", "Monte Carlo"])
+        with grid_tab:
+            scenario_levels = st.multiselect("Impact discount levels:", IMPACT_LEVELS, default=IMPACT_LEVELS, key="scenario_levels")
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                unit1_from = st.number_input("Unit 1 from:", min_value=0.0, value=float(max(st.session_state.unit1, 1)), key="scenario_unit1_from")
+            with col2:
+                unit1_to = st.number_input("Unit 1 to:", min_value=0.0, value=float(max(st.session_state.unit1, 1)) * 10, key="scenario_unit1_to")
+            with col3:
+                unit1_steps = st.number_input("Unit 1 steps:", min_value=1, max_value=5000, value=100, key="scenario_unit1_steps")
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                unit2_from = st.number_input("Unit 2 from:", min_value=0.0, value=0.5, key="scenario_unit2_from")
+            with col2:
+                unit2_to = st.number_input("Unit 2 to:", min_value=0.0, value=10.0, key="scenario_unit2_to")
+            with col3:
+                unit2_steps = st.number_input("Unit 2 steps:", min_value=1, max_value=1000, value=20, key="scenario_unit2_steps")
+            
+            if scenario_levels:
+                with rerun_profile.stage("scenario_grid"):
+                    grid = scenario_grid(
+                        row,
+                        st.session_state.selected_level,
+                        st.session_state.value_type,
+                        [level for level in IMPACT_LEVELS if level in scenario_levels],
+                        unit_range(unit1_from, unit1_to, unit1_steps),
+                        unit_range(unit2_from, unit2_to, unit2_steps),
+                    )
+                    grid_summary = grid.summary()
+                st.write(f"**Scenarios evaluated:** {grid.points:,}")
+                st.dataframe(grid_summary.style.format("{:,.2f}"), use_container_width=True)
+                
+                metric = st.selectbox("Chart:", list(grid.per_unit), key="scenario_metric")
+                unit2_axis = grid.axes["Unit 2"]
+                unit2_index = 0
+                if len(unit2_axis) > 1:
+                    unit2_index = st.select_slider("Unit 2 shown in chart:", options=list(range(len(unit2_axis))), value=len(unit2_axis) // 2, format_func=lambda i: f"{unit2_axis[i]:.2f}", key="scenario_unit2_index")
+                st.line_chart(sensitivity_frame(grid, metric, unit2_index))
+            else:
+                st.info("Select at least one impact discount level.")
+        
+        with mc_tab:
+            st.write("Unit 1, Unit 2 and the impact discount are drawn from triangular distributions (lowest, most likely, highest).")
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                unit1_low = st.number_input("Unit 1 lowest:", min_value=0.0, value=float(st.session_state.unit1) * 0.5, key="mc_unit1_low")
+                unit1_mode = st.number_input("Unit 1 most likely:", min_value=0.0, value=float(st.session_state.unit1), key="mc_unit1_mode")
+                unit1_high = st.number_input("Unit 1 highest:", min_value=0.0, value=float(st.session_state.unit1) * 1.5, key="mc_unit1_high")
+            with col2:
+                unit2_low = st.number_input("Unit 2 lowest:", min_value=0.0, value=float(st.session_state.unit2) * 0.5, key="mc_unit2_low")
+                unit2_mode = st.number_input("Unit 2 most likely:", min_value=0.0, value=float(st.session_state.unit2), key="mc_unit2_mode")
+                unit2_high = st.number_input("Unit 2 highest:", min_value=0.0, value=float(st.session_state.unit2) * 1.5, key="mc_unit2_high")
+            with col3:
+                current_discount = impact_discount(st.session_state.impact_level)
+                discount_low = st.number_input("Discount lowest:", min_value=0.0, max_value=1.0, value=max(current_discount - 0.25, 0.0), key="mc_discount_low")
+                discount_mode = st.number_input("Discount most likely:", min_value=0.0, max_value=1.0, value=current_discount, key="mc_discount_mode")
+                discount_high = st.number_input("Discount highest:", min_value=0.0, max_value=1.0, value=min(current_discount + 0.25, 1.0), key="mc_discount_high")
+            samples = st.number_input("Samples:", min_value=1000, max_value=2_000_000, value=100_000, step=10_000, key="mc_samples")
+            
+            if unit1_low <= unit1_mode <= unit1_high and unit2_low <= unit2_mode <= unit2_high and discount_low <= discount_mode <= discount_high:
+                with rerun_profile.stage("monte_carlo"):
+                    simulation = monte_carlo(
+                        row,
+                        st.session_state.selected_level,
+                        st.session_state.value_type,
+                        Distribution.triangular(unit1_low, unit1_mode, unit1_high),
+                        Distribution.triangular(unit2_low, unit2_mode, unit2_high),
+                        Distribution.triangular(discount_low, discount_mode, discount_high),
+                        samples=int(samples),
+                        seed=0,
+                    )
+                    simulation_summary = simulation.summary()
+                st.dataframe(simulation_summary.style.format("{:,.2f}"), use_container_width=True)
+                metric = st.selectbox("Chart:", list(simulation.per_unit), key="mc_metric")
+                st.bar_chart(simulation.histogram(metric))
+            else:
+                st.warning("Each lowest value must not exceed the most likely value, which must not exceed the highest.")
+    
     col1, col2, col3 = st.columns([1, 1, 1])
     with col1:
         if st.button("← Previous", use_container_width=True):
@@ -457,49 +664,25 @@ elif st.session_state.current_page == 5:
             go_to_page(6)
 
 # ============== PAGE 6: Generate Report ==============
-elif st.session_state.current_page == 6:
+@page(6)
+def render_report():
     st.markdown("<h3 style='color: orchid;'>Final: Generate Report</h3>", unsafe_allow_html=True)
     
-    if not st.session_state.row_data.empty:
-        report_data = {
-            "Stakeholders": st.session_state.stakeholders,
-            "Activity": st.session_state.activity,
-            "Outcomes": st.session_state.outcomes,
-            "Selected Value Name": st.session_state.selected_category,
-        }
-        
-        if st.session_state.selected_level == "Silver" and st.session_state.selected_silver:
-            report_data["Silver Level"] = st.session_state.selected_silver
-        
-        report_data["Key"] = st.session_state.row_data['Key'].iloc[0] if 'Key' in st.session_state.row_data else ""
-
-        report_data["Description"] = st.session_state.row_data['Description'].iloc[0] if 'Description' in st.session_state.row_data else ""
-        report_data[f"Unit 1 ({st.session_state.row_data['Unit 1'].iloc[0]})"] = st.session_state.unit1
-        if pd.notna(st.session_state.unit2_value):
-            report_data[f"Unit 2 ({st.session_state.unit2_value})"] = st.session_state.unit2
-        
-        report_data["Indicator and Source"] = st.session_state.indicator_source
-        report_data["Impact Evidence"] = st.session_state.impact_evidence
-        report_data["Impact Discount Level"] = st.session_state.impact_level
-        report_data["Impact Discount (decimal)"] = st.session_state.impact_discount_percentage
-        report_data["Base Value Per Unit (£)"] = st.session_state.base_value_per_unit
-        report_data["Monetised Value Per Unit (£)"] = st.session_state.monetised_value_per_unit
-        report_data["Total Monetised Value (£)"] = st.session_state.total_monetised_value
-        report_data["Type of Monetised Value"] = st.session_state.value_type
-        report_data[f"Total Monetised Value ({st.session_state.value_type}) (£)"] = st.session_state.total_value_by_type
-        # Add Environmental metrics if applicable
-        if st.session_state.value_type == "Environmental" and st.session_state.kg_co2_value > 0:
-            report_data["Total kg CO2"] = st.session_state.kg_co2_value
-            report_data["Total tonnes CO2"] = st.session_state.kg_co2_value / 1000
-
-        # Add Wellbeing metrics if applicable
-        if st.session_state.value_type == "Wellbeing" and st.session_state.wellby_value > 0:
-            report_data["Total WELLBYs"] = st.session_state.wellby_value
-        # Convert to DataFrame and CSV
-        report_df = pd.DataFrame(report_data.items(), columns=["Item", "Value"])
-        csv_buffer = io.StringIO()
-        report_df.to_csv(csv_buffer, index=False)
-        csv_data = csv_buffer.getvalue()
+    row = catalogue.row(st.session_state.selection)
+    if row is not None:
+        with rerun_profile.stage("report"):
+            # The estimate and serialized report come from the shared memo; only the notes are per session
+            memo_entry = estimate_memo.get(catalogue, st.session_state.selection, current_inputs())
+            notes = ReportNotes(
+                stakeholders=st.session_state.stakeholders,
+                activity=st.session_state.activity,
+                outcomes=st.session_state.outcomes,
+                indicator_source=st.session_state.indicator_source,
+                impact_evidence=st.session_state.impact_evidence,
+            )
+            report_data = memo_entry.report_items(notes)
+            report_df = report_frame(report_data)
+            csv_data = memo_entry.report_bytes(notes)
         
         st.download_button(
             label="📥 Download Report as CSV",
@@ -509,12 +692,72 @@ elif st.session_state.current_page == 6:
             use_container_width=True
         )
         
+        item = {
+            "Stakeholders": st.session_state.stakeholders,
+            "Activity": st.session_state.activity,
+            "Outcomes": st.session_state.outcomes,
+            "Indicator and Source": st.session_state.indicator_source,
+            "Impact Evidence": st.session_state.impact_evidence,
+            "Value name": st.session_state.selected_category,
+            "Key": report_data["Key"],
+            "Level": st.session_state.selected_level,
+            "Silver name": st.session_state.selected_silver if st.session_state.selected_level == "Silver" else None,
+            "Impact level": st.session_state.impact_level,
+            "Type of monetised value": st.session_state.value_type,
+            "Unit 1": st.session_state.unit1,
+            "Unit 2": st.session_state.unit2,
+            "Base Value Per Unit (£)": st.session_state.base_value_per_unit,
+            "Total Monetised Value (£)": st.session_state.total_monetised_value,
+            "Total Monetised Value By Type (£)": st.session_state.total_value_by_type,
+            "Total kg CO2": st.session_state.kg_co2_value,
+            "Total WELLBYs": st.session_state.wellby_value,
+            "Duration (years)": duration_years(row.get("Unit 2"), st.session_state.unit2),
+            "Catalogue version": catalogue.version,
+        }
+        col1, col2 = st.columns(2)
+        with col1:
+            add_clicked = st.button("➕ Add to Portfolio", use_container_width=True)
+        with col2:
+            save_clicked = st.button("💾 Save Estimate", use_container_width=True)
+        if save_clicked:
+            estimate_id = get_store().save(item, session_id=st.session_state.session_id)
+            st.success(f"Saved as estimate #{estimate_id}. Find it under Saved Estimates on the start page.")
+        if add_clicked:
+            st.session_state.portfolio.add(item)
+            st.success(f"Added to portfolio ({len(st.session_state.portfolio)} activities).")
+        
         st.markdown("---")
         st.markdown("<p style='font-size:18px; font-weight:bold; color:orchid;'>Report Preview</p>", unsafe_allow_html=True)
         st.table(report_df)
     else:
         st.error("No data available. Please complete all previous steps.")
     
+    # Portfolio of activities estimated in this session
+    portfolio = st.session_state.portfolio
+    if len(portfolio) > 0:
+        st.markdown("---")
+        st.markdown("<p style='font-size:18px; font-weight:bold; color:orchid;'>Portfolio</p>", unsafe_allow_html=True)
+        st.write(f"**Activities:** {len(portfolio)}")
+        st.write(f"**Total monetised value in £:** {portfolio.total.monetised:.2f}")
+        st.write(f"**Total kg CO2:** {portfolio.total.kg_co2:.2f}")
+        st.write(f"**Total WELLBYs:** {portfolio.total.wellbys:.2f}")
+        
+        tab1, tab2, tab3 = st.tabs(["By value type", "By stakeholder", "By Value name"])
+        with tab1:
+            st.dataframe(portfolio.totals("value_type"), use_container_width=True)
+        with tab2:
+            st.dataframe(portfolio.totals("stakeholder"), use_container_width=True)
+        with tab3:
+            st.dataframe(portfolio.totals("value_name"), use_container_width=True)
+        
+        download_table("📥 Download Portfolio", portfolio.to_frame(), "measureup_portfolio", "portfolio_download", PORTFOLIO_DTYPES)
+        if st.checkbox("📈 Project value over the years", key="portfolio_projection_enabled"):
+            projection_section(portfolio.project, "portfolio_projection")
+        if st.button("🗑️ Clear Portfolio", use_container_width=True):
+            portfolio.clear()
+            rerun_profile.finish()
+            st.rerun()
+    
     st.markdown("---")
     col1, col2, col3 = st.columns([1, 1, 1])
     with col1:
@@ -522,7 +765,144 @@ elif st.session_state.current_page == 6:
             go_to_page(5)
     with col2:
         if st.button("🏠 Start Over", use_container_width=True):
-            # Reset all session state
+            # Reset all session state except the portfolio and the profiling session id
             for key in list(st.session_state.keys()):
-                del st.session_state[key]
+                if key not in ("portfolio", "session_id"):
+                    del st.session_state[key]
+            rerun_profile.finish()
             st.rerun()
+
+# ============== PAGE 7: Bulk Estimate ==============
+@page(7)
+def render_bulk_estimate():
+    st.markdown("<h3 style='color: #4b0082;'>Bulk Estimate: value many activities at once</h3>", unsafe_allow_html=True)
+    
+    st.markdown("""
+    Upload a CSV or Excel table with one activity per row. Each row needs a **Key** or **Value name**; the other columns are optional:
+    
+    - Level: Bronze (default) or Silver, with the **Silver name** for Silver rows.
+    - Unit 1 and Unit 2: quantity and duration, numbers of at least 0 (Unit 2 defaults to 1).
+    - Impact level: No discount, Low (default), Medium or High.
+    - Type of monetised value: Economic (default), Fiscal, Wellbeing or Environmental.
+    """)
+    
+    template_csv = pd.DataFrame(columns=list(INPUT_COLUMNS)).to_csv(index=False)
+    st.download_button(
+        label="📄 Download input template",
+        data=template_csv,
+        file_name="measureup_bulk_template.csv",
+        mime="text/csv",
+    )
+    
+    uploaded = st.file_uploader("Activities table", type=["csv", "xlsx"], key="bulk_upload")
+    if uploaded is not None:
+        try:
+            with rerun_profile.stage("bulk_estimate"):
+                results = estimate_upload(uploaded.getvalue(), uploaded.name, catalogue.version, catalogue)
+        except Exception as e:
+            st.error(f"Could not estimate the uploaded table: {e}")
+        else:
+            ok = results["Status"] == "ok"
+            st.write(f"**Rows estimated:** {int(ok.sum())} of {len(results)}")
+            if not ok.all():
+                st.warning(f"{int((~ok).sum())} rows could not be estimated, see the Status column.")
+            st.write(f"**Total monetised value in £:** {results.loc[ok, 'Total Monetised Value (£)'].sum():.2f}")
+            st.write(f"**Total kg CO2:** {results.loc[ok, 'Total kg CO2'].sum():.2f}")
+            st.write(f"**Total WELLBYs:** {results.loc[ok, 'Total WELLBYs'].sum():.2f}")
+            
+            download_table("📥 Download Results", results, "measureup_bulk_results", "bulk_download", RESULT_DTYPES)
+            if st.checkbox("📈 Project value over the years", key="bulk_projection_enabled"):
+                projection_section(lambda settings: project_results(results, settings), "bulk_projection")
+            
+            st.markdown("<p style='font-size:18px; font-weight:bold; color:#4b0082;'>Results Preview</p>", unsafe_allow_html=True)
+            st.dataframe(results.head(1000), use_container_width=True)
+    
+    st.markdown("---")
+    col1, col2, col3 = st.columns([1, 1, 1])
+    with col1:
+        if st.button("← Previous", use_container_width=True):
+            go_to_page(1)
+
+# ============== PAGE 8: Saved Estimates ==============
+@page(8)
+def render_saved_estimates():
+    st.markdown("<h3 style='color: #4b0082;'>Saved Estimates</h3>", unsafe_allow_html=True)
+    store = get_store()
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        saved_search = st.text_input("Value name or activity contains:", key="saved_search")
+    with col2:
+        saved_type = st.selectbox("Type of monetised value:", ["All"] + VALUE_TYPES, key="saved_type")
+    with col3:
+        saved_since = st.date_input("Saved since:", value=None, key="saved_since")
+    filters = {
+        "search": saved_search.strip(),
+        "value_type": None if saved_type == "All" else saved_type,
+        "since": saved_since,
+    }
+    
+    with rerun_profile.stage("saved_query"):
+        saved_count = store.count(**filters)
+        saved = store.list(limit=200, **filters)
+    st.write(f"**Saved estimates:** {saved_count}" + (" (showing the 200 most recent)" if saved_count > 200 else ""))
+    
+    if saved_count:
+        st.dataframe(saved, hide_index=True, use_container_width=True)
+        
+        grouping = st.selectbox("Totals by:", list(SAVED_GROUPINGS), format_func=lambda grouping: SAVED_GROUPINGS[grouping][0], key="saved_grouping")
+        st.dataframe(store.aggregate(grouping, **filters), use_container_width=True)
+        
+        col1, col2, col3 = st.columns([1, 1, 1])
+        with col1:
+            estimate_id = st.selectbox("Estimate:", saved["ID"].tolist(), format_func=lambda estimate_id: f"#{estimate_id}", key="saved_id")
+        record = store.get(int(estimate_id))
+        with col2:
+            st.write("")
+            if st.button("📂 Open in Wizard", use_container_width=True) and record is not None:
+                # Restore the inputs and notes; page 6 recalculates with the current catalogue
+                st.session_state.stakeholders = record["Stakeholders"]
+                st.session_state.activity = record["Activity"]
+                st.session_state.outcomes = record["Outcomes"]
+                st.session_state.indicator_source = record["Indicator and Source"]
+                st.session_state.impact_evidence = record["Impact Evidence"]
+                st.session_state.selected_category = record["Value name"]
+                st.session_state.selected_level = record["Level"] or "Bronze"
+                st.session_state.selected_silver = record["Silver name"] or None
+                st.session_state.selection = (record["Value name"], st.session_state.selected_level, st.session_state.selected_silver)
+                st.session_state.unit1 = int(record["Unit 1"])
+                st.session_state.unit2 = record["Unit 2"]
+                st.session_state.impact_level = record["Impact level"] or "Low"
+                st.session_state.value_type = record["Type of monetised value"] or "Economic"
+                go_to_page(5)
+        with col3:
+            st.write("")
+            if st.button("🗑️ Delete", use_container_width=True):
+                store.delete(int(estimate_id))
+                rerun_profile.finish()
+                st.rerun()
+    
+    st.markdown("---")
+    col1, col2, col3 = st.columns([1, 1, 1])
+    with col1:
+        if st.button("← Previous", use_container_width=True):
+            go_to_page(1)
+
+PAGES[st.session_state.current_page]()
+
+rerun_profile.finish()
+
+# Debug panel with the timings recorded so far, only when profiling is enabled
+if PROFILE_ENABLED:
+    with st.sidebar.expander("⏱️ Profiling", expanded=False):
+        st.write(f"**Reruns this session:** {profile_registry.session_reruns(st.session_state.session_id)}")
+        st.write("**Last rerun (ms):**")
+        st.json({stage: round(seconds * 1000, 2) for stage, seconds in rerun_profile.stages.items()})
+        st.write("**Estimate memo (all sessions):**")
+        st.json(estimate_memo.stats())
+        st.write("**All sessions in this process:**")
+        st.dataframe(
+            pd.DataFrame(profile_registry.summary(), columns=["Page", "Stage", "Runs", "Total ms", "Mean ms", "Max ms"]),
+            hide_index=True,
+            use_container_width=True
+        )